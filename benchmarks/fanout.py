@@ -0,0 +1,295 @@
+"""End-to-end cost of the stream pipeline, from a synthetic PyNinja target to simulated browsers.
+
+The frames go through a ``Monitor`` and the websocket endpoint, with Prometheus scraping alongside.
+
+The target and the browsers run in their own processes, so the CPU time and memory reported are the server's alone.
+Everything runs on localhost, without any network access.
+
+Usage:
+    python -m benchmarks.fanout [--clients 50] [--seconds 10] [--interval 0.05] [--protocol 2] ...
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import resource
+import socket
+import statistics
+import time
+import warnings
+from typing import Any, Dict, List, Tuple
+
+import aiohttp
+import uvicorn
+
+from benchmarks import pyninja
+from pyobservability import main as server
+from pyobservability.config import settings
+
+# Seconds for the clients to connect and the stream to settle, before the measurement starts
+WARMUP = 2
+# Seconds between the scrapes of the metrics endpoint
+SCRAPE_INTERVAL = 1
+
+
+def free_port() -> int:
+    """Port that is free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Percentile of the samples, 0 when there are none."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def browse(
+    session: aiohttp.ClientSession, url: str, base_url: str, protocol: int, until: float
+) -> List[Tuple[float, float]]:
+    """Simulate a browser watching the target.
+
+    Args:
+        session: Session to connect with.
+        url: Websocket URL of the server.
+        base_url: Base URL of the target to select.
+        protocol: Stream protocol announced by the browser, 2 and above receive deltas.
+        until: Monotonic time to disconnect at.
+
+    Returns:
+        List[Tuple[float, float]]:
+        Arrival time and fan-out latency of every metrics message, the latency being measured from the time the
+        server built the frame, as the server's event loop and this process share the monotonic clock.
+    """
+    received = []
+    async with session.ws_connect(url, max_msg_size=0) as ws:
+        await ws.send_json({"type": "select_target", "base_url": base_url, "protocol": protocol, "compression": []})
+        while (timeout := until - time.monotonic()) > 0:
+            try:
+                msg = await ws.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            now = time.monotonic()
+            # the send time leads the message, so it is read without decoding the payload
+            if msg.data.startswith('{"type":"metrics","ts":'):
+                end = msg.data.index(",", 23)
+                ts = float(msg.data[23:end])
+                received.append((now, now - ts))
+    return received
+
+
+async def scrape(session: aiohttp.ClientSession, url: str, until: float) -> List[Tuple[float, float, int]]:
+    """Scrape the metrics endpoint periodically, as Prometheus would.
+
+    Args:
+        session: Session to scrape with.
+        url: URL of the metrics endpoint.
+        until: Monotonic time to stop at.
+
+    Returns:
+        List[Tuple[float, float, int]]:
+        Time, duration and size of every scrape.
+    """
+    scrapes = []
+    while time.monotonic() + SCRAPE_INTERVAL < until:
+        await asyncio.sleep(SCRAPE_INTERVAL)
+        start = time.monotonic()
+        async with session.get(url) as response:
+            body = await response.read()
+        scrapes.append((start, time.monotonic() - start, len(body)))
+    return scrapes
+
+
+def clients(port: int, base_url: str, count: int, protocol: int, until: float, results: Any, scraper: bool) -> None:
+    """Entry point of a process simulating browsers, sending their messages back to the benchmark.
+
+    Args:
+        port: Port of the server.
+        base_url: Base URL of the target to select.
+        count: Number of browsers.
+        protocol: Stream protocol announced by the browsers.
+        until: Monotonic time to disconnect at.
+        results: Queue to put the messages received by each browser, and the scrapes in.
+        scraper: Scrapes the metrics endpoint along with the browsers.
+    """
+
+    async def run() -> None:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+            url = f"ws://127.0.0.1:{port}/ws"
+            browsers = [browse(session, url, base_url, protocol, until) for _ in range(count)]
+            scrapes = [scrape(session, f"http://127.0.0.1:{port}/metrics", until)] if scraper else []
+            received = await asyncio.gather(*browsers, *scrapes)
+            scraped = received.pop() if scraper else []
+            results.put((received, scraped))
+
+    asyncio.run(run())
+
+
+async def upstream_frames(session: aiohttp.ClientSession, port: int) -> int:
+    """Frames sent by the synthetic target so far."""
+    async with session.get(f"http://127.0.0.1:{port}/stats") as response:
+        return (await response.json())["frames"]
+
+
+def rss_mb() -> float:
+    """Current resident memory of the process, in MB."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def measure(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the server against the synthetic target and the simulated browsers, and measure it.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Dict[str, Any]:
+        Measurements of the server over the window.
+    """
+    spawn = multiprocessing.get_context("spawn")
+    target_port, server_port = free_port(), free_port()
+    target = spawn.Process(
+        target=pyninja.run, args=(target_port, args.interval, args.cores, args.services, args.processes), daemon=True
+    )
+    target.start()
+    async with aiohttp.ClientSession() as session:
+        while True:
+            with contextlib.suppress(aiohttp.ClientError):
+                await upstream_frames(session, target_port)
+                break
+            await asyncio.sleep(0.1)
+
+    settings.env = settings.EnvConfig(
+        targets=[{"name": "bench", "base_url": f"http://127.0.0.1:{target_port}", "apikey": "bench"}],
+        host="127.0.0.1",
+        port=server_port,
+        prometheus_enabled=args.scrape,
+    )
+    with warnings.catch_warnings():
+        # benchmarked without authentication, on purpose
+        warnings.simplefilter("ignore", UserWarning)
+        server.configure()
+    # as normalized by the settings, which is how the browsers select the target
+    base_url = next(iter(settings.targets_by_url))
+    uvicorn_server = uvicorn.Server(
+        uvicorn.Config(server.PyObservability, host="127.0.0.1", port=server_port, log_level="warning")
+    )
+    # configured by uvicorn along with its own loggers, the server's logs would interleave with the report
+    logging.getLogger("uvicorn.default").setLevel(logging.WARNING)
+    serving = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.05)
+
+    start = time.monotonic() + WARMUP
+    end = start + args.seconds
+    results = spawn.Queue()
+    shares = [
+        args.clients // args.client_processes + (idx < args.clients % args.client_processes)
+        for idx in range(args.client_processes)
+    ]
+    browsers = [
+        spawn.Process(
+            target=clients,
+            args=(server_port, base_url, share, args.protocol, end, results, args.scrape and idx == 0),
+            daemon=True,
+        )
+        for idx, share in enumerate(shares)
+    ]
+    for process in browsers:
+        process.start()
+
+    async with aiohttp.ClientSession() as session:
+        await asyncio.sleep(max(0.0, start - time.monotonic()))
+        frames_before, cpu_before = await upstream_frames(session, target_port), time.process_time()
+        await asyncio.sleep(max(0.0, end - time.monotonic()))
+        frames_after, cpu_after = await upstream_frames(session, target_port), time.process_time()
+    rss = rss_mb()
+
+    loop = asyncio.get_running_loop()
+    received, scraped = [], []
+    for _ in browsers:
+        per_browser, scrapes = await loop.run_in_executor(None, results.get)
+        received.extend(per_browser)
+        scraped.extend(scrapes)
+    for process in browsers:
+        process.join()
+    uvicorn_server.should_exit = True
+    await serving
+    target.terminate()
+
+    latencies = [latency for messages in received for arrival, latency in messages if start <= arrival < end]
+    frames = frames_after - frames_before
+    cpu = cpu_after - cpu_before
+    return {
+        "frame_size": len(pyninja.frames(1, cores=args.cores, services=args.services, processes=args.processes)[0]),
+        "frames": frames,
+        "delivered": len(latencies),
+        "cpu": cpu,
+        "latencies": latencies,
+        "scrapes": [(duration, size) for at, duration, size in scraped if start <= at < end],
+        "rss": rss,
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def report(args: argparse.Namespace, result: Dict[str, Any]) -> None:
+    """Print the measurements."""
+    frames, delivered, cpu = result["frames"], result["delivered"], result["cpu"]
+    expected = frames * args.clients
+    print(
+        f"target:     {args.cores} cores, {args.services} services, {args.processes} processes, "
+        f"{result['frame_size'] / 1024:.1f} KB per frame every {args.interval}s"
+    )
+    print(f"clients:    {args.clients} on protocol {args.protocol}, measured over {args.seconds}s")
+    print(f"upstream:   {frames / args.seconds:10.1f} frames/s")
+    print(
+        f"delivered:  {delivered / args.seconds:10.1f} frames/s "
+        f"({max(0, expected - delivered)} of {expected} not delivered)"
+    )
+    print(
+        f"server CPU: {cpu / max(frames, 1) * 1e6:10.1f} µs/frame, {cpu / max(delivered, 1) * 1e6:.1f} µs/delivery, "
+        f"{cpu / args.seconds * 100:.1f}% of a core"
+    )
+    latencies = result["latencies"]
+    print(
+        f"fan-out:    p50 {percentile(latencies, 50) * 1e3:.2f} ms, p99 {percentile(latencies, 99) * 1e3:.2f} ms, "
+        f"max {max(latencies, default=0) * 1e3:.2f} ms"
+    )
+    if result["scrapes"]:
+        durations = [duration for duration, _ in result["scrapes"]]
+        print(
+            f"scrape:     p50 {statistics.median(durations) * 1e3:.2f} ms, "
+            f"{result['scrapes'][-1][1] / 1024:.1f} KB, {len(durations)} scrapes"
+        )
+    print(f"RSS:        {result['rss']:10.1f} MB (peak {result['peak_rss']:.1f} MB)")
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark and print its report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50, help="simulated browsers")
+    parser.add_argument("--client-processes", type=int, default=1, help="processes to spread the browsers across")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of the measurement")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between frames of the target")
+    parser.add_argument("--cores", type=int, default=8, help="CPU cores in the payloads")
+    parser.add_argument("--services", type=int, default=10, help="service rows in the payloads")
+    parser.add_argument("--processes", type=int, default=20, help="process rows in the payloads")
+    parser.add_argument("--protocol", type=int, default=2, help="stream protocol of the browsers, 2 for deltas")
+    parser.add_argument("--no-scrape", dest="scrape", action="store_false", help="skip the Prometheus scrapes")
+    args = parser.parse_args()
+    report(args, asyncio.run(measure(args)))
+
+
+if __name__ == "__main__":
+    main()
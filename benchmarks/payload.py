@@ -0,0 +1,122 @@
+"""Synthetic PyNinja payloads, shaped like the frames streamed by its ``/observability`` endpoint."""
+
+import random
+from typing import Any, Dict
+
+GB = 1024**3
+
+
+def sample(
+    seq: int = 0,
+    cores: int = 8,
+    services: int = 10,
+    processes: int = 20,
+    containers: int = 5,
+    disks: int = 2,
+    node: str = "bench",
+) -> Dict[str, Any]:
+    """Generate one observability frame of a node.
+
+    Args:
+        seq: Sequence number of the frame, varies the values between frames.
+        cores: Number of CPU cores.
+        services: Number of monitored services.
+        processes: Number of monitored processes.
+        containers: Number of running docker containers.
+        disks: Number of physical disks.
+        node: Hostname of the node.
+
+    Returns:
+        Dict[str, Any]:
+        Metrics payload of the node.
+    """
+    rand = random.Random(seq)
+    memory_total, swap_total = 32 * GB, 4 * GB
+    memory_used = int(memory_total * rand.uniform(0.3, 0.7))
+    swap_used = int(swap_total * rand.uniform(0.0, 0.2))
+    return {
+        "ip_info": {"private": "10.0.0.10", "public": "203.0.113.10"},
+        "system": "Linux",
+        "architecture": "x86_64",
+        "node": node,
+        "cores": cores,
+        "uptime": f"{seq} seconds",
+        "cpu_name": "Intel(R) Xeon(R) CPU E5-2680 v4 @ 2.40GHz",
+        "disks_info": [
+            {"Name": f"Disk {idx}", "Size": "512 GB", "Device Id": f"/dev/sd{chr(97 + idx)}", "Mountpoints": "/"}
+            for idx in range(disks)
+        ],
+        "memory_info": {
+            "total": memory_total,
+            "available": memory_total - memory_used,
+            "percent": round(memory_used / memory_total * 100, 1),
+            "used": memory_used,
+            "free": memory_total - memory_used,
+            "active": memory_used // 2,
+            "inactive": memory_used // 4,
+            "buffers": 512 * 1024**2,
+            "cached": 4 * GB,
+            "shared": 256 * 1024**2,
+            "slab": 300 * 1024**2,
+        },
+        "swap_info": {
+            "total": swap_total,
+            "used": swap_used,
+            "free": swap_total - swap_used,
+            "percent": round(swap_used / swap_total * 100, 1),
+            "sin": seq * 4096,
+            "sout": seq * 8192,
+        },
+        "load_averages": {"m1": rand.uniform(0, cores), "m5": rand.uniform(0, cores), "m15": rand.uniform(0, cores)},
+        "cpu_usage": [round(rand.uniform(0, 100), 1) for _ in range(cores)],
+        "docker_stats": [
+            {
+                "Container ID": f"{idx:012x}",
+                "Container Name": f"container-{idx}",
+                "CPU": f"{rand.uniform(0, 50):.2f}%",
+                "CPU Usage": f"{rand.uniform(0, 2):.2f} / {cores}",
+                "Memory": f"{rand.uniform(0, 10):.2f}%",
+                "Memory Usage": "512MiB / 31.2GiB",
+                "Block I/O": "1.2MB / 0B",
+                "Network I/O": "10kB / 2kB",
+            }
+            for idx in range(containers)
+        ],
+        "service_stats": [
+            {
+                "PID": 1000 + idx,
+                "Name": f"service-{idx}",
+                "Status": "running",
+                "CPU": f"{rand.uniform(0, 10):.2f}%",
+                "Memory": "120.5 MB",
+                "Uptime": "3 days",
+                "Threads": rand.randint(1, 64),
+                "Open Files": rand.randint(0, 128),
+                "Read I/O": "1.2 MB",
+                "Write I/O": "300 KB",
+            }
+            for idx in range(services)
+        ],
+        "process_stats": [
+            {
+                "PID": 5000 + idx,
+                "Name": f"process-{idx}",
+                "Status": "sleeping",
+                "CPU": f"{rand.uniform(0, 10):.2f}%",
+                "Memory": "64.0 MB",
+                "Uptime": "5 hours",
+                "Threads": rand.randint(1, 16),
+                "Open Files": rand.randint(0, 32),
+                "Read I/O": "64 KB",
+                "Write I/O": "0 B",
+            }
+            for idx in range(processes)
+        ],
+        "disk_info": [
+            {"name": f"Disk {idx}", "id": f"disk{idx}", "total": 512 * GB, "used": (100 + idx) * GB, "free": 412 * GB}
+            for idx in range(disks)
+        ],
+        "certificates": [],
+        "python_version": "3.11.7",
+        "pyninja_version": "5.2.0",
+    }
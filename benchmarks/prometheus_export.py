@@ -0,0 +1,90 @@
+"""Cost of exporting payloads to Prometheus, per-frame recursive walk versus the scrape-time collector.
+
+Usage:
+    python -m benchmarks.prometheus_export [frames] [frames_per_scrape]
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from prometheus_client import CollectorRegistry, Gauge, generate_latest
+
+from benchmarks.payload import sample
+from pyobservability import prometheus
+from pyobservability.config import settings
+
+
+def legacy_flatten(registry: CollectorRegistry, gauges: Dict[str, Gauge]) -> Callable:
+    """Recursive flattener updating gauges on every frame, the baseline of the scrape-time ``MonitorCollector``."""
+
+    def flatten_payload(node: str, data: dict, parent_keys: List[str] = None) -> None:
+        for key, value in data.items():
+            metric_path = parent_keys or [] + [key]
+            if isinstance(value, (int, float)):
+                metric_name = "_".join(metric_path).lower()
+                if metric_name not in gauges:
+                    gauges[metric_name] = Gauge(metric_name, f"Metric for {metric_name}", ["node"], registry=registry)
+                gauges[metric_name].labels(node=node).set(value)
+            elif isinstance(value, dict):
+                flatten_payload(node, value, metric_path)
+            elif isinstance(value, list):
+                for idx, item in enumerate(value):
+                    if isinstance(item, (int, float)):
+                        metric_name = "_".join(metric_path + [str(idx)]).lower()
+                        if metric_name not in gauges:
+                            gauges[metric_name] = Gauge(
+                                metric_name, f"Metric for {metric_name}", ["node"], registry=registry
+                            )
+                        gauges[metric_name].labels(node=node).set(item)
+                    elif isinstance(item, dict):
+                        flatten_payload(node, item, metric_path + [str(idx)])
+
+    return flatten_payload
+
+
+def series(registry: CollectorRegistry) -> int:
+    """Number of payload series exported by a registry."""
+    return sum(len(metric.samples) for metric in registry.collect() if not metric.name.startswith("pyobservability_"))
+
+
+def measure(push: Callable[[dict], None], scrape: Callable[[], bytes], frames: List[dict], per_scrape: int) -> float:
+    """Average microseconds spent per frame, including a scrape every ``per_scrape`` frames."""
+    push(frames[0])
+    start = time.perf_counter()
+    for idx, frame in enumerate(frames, start=1):
+        push(frame)
+        if idx % per_scrape == 0:
+            scrape()
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def main(count: int = 5_000, per_scrape: int = 5) -> None:
+    """Run both exporters over the same frames and compare their cost."""
+    settings.env = settings.EnvConfig(targets=[])
+    frames = [sample(seq) for seq in range(count)]
+
+    legacy_registry = CollectorRegistry()
+    legacy = legacy_flatten(legacy_registry, {})
+    before = measure(lambda frame: legacy("bench", frame), lambda: generate_latest(legacy_registry), frames, per_scrape)
+
+    collector_registry = CollectorRegistry()
+    monitor = SimpleNamespace(name="bench", base_url="http://bench/", latest=None, latest_at=0.0, lag=0)
+    collector_registry.register(prometheus.MonitorCollector({"bench": monitor}))
+
+    def push(frame: dict) -> None:
+        monitor.latest, monitor.latest_at = frame, time.monotonic()
+
+    after = measure(push, lambda: generate_latest(collector_registry), frames, per_scrape)
+
+    print(f"frames: {count}, scraped every {per_scrape} frames")
+    print(f"per-frame recursive walk: {before:8.2f} µs/frame, {series(legacy_registry)} series")
+    print(
+        f"scrape-time collector:    {after:8.2f} µs/frame, {series(collector_registry)} series "
+        f"({before / after:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
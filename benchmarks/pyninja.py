@@ -0,0 +1,93 @@
+"""Synthetic PyNinja server, streaming ``/observability`` as NDJSON without any network access beyond localhost.
+
+Usage:
+    python -m benchmarks.pyninja [port] [interval] [cores] [services] [processes]
+"""
+
+import asyncio
+import json
+import sys
+from typing import List
+
+from aiohttp import web
+
+from benchmarks.payload import sample
+
+# Distinct frames cycled through by the stream, encoded up front so that the server costs little per frame
+VARIANTS = 64
+
+
+def frames(count: int = VARIANTS, **shape: int) -> List[bytes]:
+    """Encode the frames streamed by the server.
+
+    Args:
+        count: Number of distinct frames.
+        shape: Shape of the payloads, as accepted by ``payload.sample``.
+
+    Returns:
+        List[bytes]:
+        NDJSON lines of the payloads.
+    """
+    return [json.dumps(sample(seq, **shape)).encode() + b"\n" for seq in range(count)]
+
+
+def app(interval: float, **shape: int) -> web.Application:
+    """Build the server.
+
+    Args:
+        interval: Seconds between frames, regardless of the interval requested by the client.
+        shape: Shape of the payloads, as accepted by ``payload.sample``.
+
+    Returns:
+        web.Application:
+        Server with the ``/observability``, ``/version`` and ``/stats`` routes.
+    """
+    lines = frames(**shape)
+    stats = {"streams": 0, "frames": 0}
+
+    async def observability(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        stats["streams"] += 1
+        try:
+            seq = 0
+            while True:
+                await response.write(lines[seq % len(lines)])
+                stats["frames"] += 1
+                seq += 1
+                await asyncio.sleep(interval)
+        except ConnectionResetError:
+            return response
+        finally:
+            stats["streams"] -= 1
+
+    async def version(_: web.Request) -> web.Response:
+        return web.json_response({"python_version": "3.11.7", "pyninja_version": "5.2.0"})
+
+    async def counters(_: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    application = web.Application()
+    application.router.add_get("/observability", observability)
+    application.router.add_get("/version", version)
+    application.router.add_get("/stats", counters)
+    return application
+
+
+def run(port: int, interval: float, cores: int = 8, services: int = 10, processes: int = 20) -> None:
+    """Serve the synthetic stream on localhost until the process is terminated.
+
+    Args:
+        port: Port to listen on.
+        interval: Seconds between frames.
+        cores: Number of CPU cores in the payloads.
+        services: Number of service rows in the payloads.
+        processes: Number of process rows in the payloads.
+    """
+    application = app(interval, cores=cores, services=services, processes=processes)
+    web.run_app(application, host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    run(int(argv[0]) if argv else 8000, float(argv[1]) if len(argv) > 1 else 1.0, *map(int, argv[2:]))
@@ -13,6 +13,7 @@ def _cli() -> None:
         - ``--version | -V``: Prints the version.
         - ``--help | -H``: Prints the help section.
         - ``--env | -E <path>``: Filepath to load environment variables.
+        - ``--collector``: Runs headless, streaming all the targets without the UI.
 
     **Commands**
         ``start``: Initiates the PyObservability as a regular script.
@@ -22,6 +23,7 @@ def _cli() -> None:
         "--version | -V": "Prints the version.",
         "--help | -H": "Prints the help section.",
         "--env | -E <path>": "Filepath to load environment variables.",
+        "--collector": "Runs headless, streaming all the targets without the UI.",
         "start": "Initiates the PyObservability as a regular script.",
     }
     # weird way to increase spacing to keep all values monotonic
@@ -59,7 +61,10 @@ def _cli() -> None:
         print(f"Unknown Option: {sys.argv[1]}\nArbitrary commands must be one of {choices}")
         exit(1)
     if any(arg in args for arg in ("start",)):
-        start(env_file=env_file)
+        kwargs = {"env_file": env_file} if env_file else {}
+        if "--collector" in args:
+            kwargs["mode"] = "collector"
+        start(**kwargs)
     else:
         print(
             "Insufficient Arguments:\n\tNo command received to initiate the PyObservability. "
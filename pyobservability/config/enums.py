@@ -9,8 +9,13 @@ class APIEndpoints(StrEnum):
     """
 
     runners = "/runners"
+    history = "/history"
     metrics = "/metrics"
+    internal_metrics = "/internal/metrics"
+    internal_profile = "/internal/profile"
+    peer_ws = "/peer/ws"
     health = "/health"
+    kuma_ws = "/kuma/ws"
     kuma = "/kuma"
     root = "/"
     ws = "/ws"
@@ -25,3 +30,66 @@ class Log(StrEnum):
 
     file = "file"
     stdout = "stdout"
+
+
+class Compression(StrEnum):
+    """Compression modes for the websocket stream.
+
+    >>> Compression
+
+    """
+
+    none = "none"
+    deflate = "deflate"
+    zlib = "zlib"
+
+
+class Backpressure(StrEnum):
+    """Backpressure policies for subscribers falling behind the stream.
+
+    >>> Backpressure
+
+    """
+
+    drop_oldest = "drop_oldest"
+    coalesce = "coalesce"
+    disconnect = "disconnect"
+
+
+class Mode(StrEnum):
+    """Run modes of the server.
+
+    >>> Mode
+
+    """
+
+    server = "server"
+    collector = "collector"
+
+
+class MonitorState(StrEnum):
+    """Connection states of a monitor's upstream stream.
+
+    >>> MonitorState
+
+    """
+
+    connecting = "connecting"
+    connected = "connected"
+    backing_off = "backing_off"
+    open = "open"
+    half_open = "half_open"
+
+
+class IPCRequest(StrEnum):
+    """Requests of the worker processes to the collector process.
+
+    >>> IPCRequest
+
+    """
+
+    stream = "stream"
+    health = "health"
+    kuma = "kuma"
+    kuma_updates = "kuma_updates"
+    runners = "runners"
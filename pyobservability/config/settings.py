@@ -2,10 +2,11 @@ import json
 import logging
 import os
 import pathlib
+import re
 import socket
 from typing import Any, Dict, Iterable, List, Optional
 
-from pydantic import BaseModel, Field, FilePath, HttpUrl, PositiveInt
+from pydantic import BaseModel, Field, FilePath, HttpUrl, PositiveInt, model_validator
 from pydantic.aliases import AliasChoices
 from pydantic_settings import BaseSettings
 
@@ -210,6 +211,9 @@ class EnvConfig(PydanticEnvConfig):
 
     host: str = Field(socket.gethostbyname("localhost") or "0.0.0.0", validation_alias=alias_choices("HOST", "MONITOR"))
     port: PositiveInt = Field(8080, validation_alias=alias_choices("PORT", "MONITOR"))
+    mode: enums.Mode = enums.Mode.server
+    workers: PositiveInt = 1
+    ipc_path: pathlib.Path | None = None
     legacy_ui: bool = False
 
     targets: List[MonitorTarget] = Field(..., validation_alias=alias_choices("TARGETS", "MONITOR"))
@@ -223,6 +227,9 @@ class EnvConfig(PydanticEnvConfig):
     username: str | None = Field(None, validation_alias=alias_choices("USERNAME", "MONITOR"))
     password: str | None = Field(None, validation_alias=alias_choices("PASSWORD", "MONITOR"))
     timeout: PositiveInt = Field(300, validation_alias=alias_choices("TIMEOUT", "MONITOR"))
+    ws_compression: enums.Compression = enums.Compression.deflate
+    ws_backpressure: enums.Backpressure = enums.Backpressure.drop_oldest
+    ws_max_drops: PositiveInt = 50
 
     kuma_url: str | None = Field(None, validation_alias=alias_choices("KUMA_URL", "UPTIME"))
     kuma_username: str | None = Field(None, validation_alias=alias_choices("KUMA_USERNAME", "UPTIME"))
@@ -232,8 +239,21 @@ class EnvConfig(PydanticEnvConfig):
     git_url: HttpUrl = Field("https://api.github.com", validation_alias=alias_choices("GIT_URL", "GITHUB_URL"))
     git_org: str | None = Field(None, validation_alias=alias_choices(choices=("GIT_ORG", "GITHUB_ORG")))
     git_token: str | None = Field(None, validation_alias=alias_choices(choices=("GIT_TOKEN", "GITHUB_TOKEN")))
+    git_sources: List[str] = Field([], validation_alias=alias_choices(choices=("GIT_SOURCES", "GITHUB_SOURCES")))
+    git_interval: PositiveInt = Field(30, validation_alias=alias_choices(choices=("GIT_INTERVAL", "GITHUB_INTERVAL")))
 
     prometheus_enabled: bool = False
+    prometheus_max_series: PositiveInt = 200
+    internal_metrics: bool = False
+
+    history_path: pathlib.Path | None = None
+    history_retention_raw: PositiveInt = 86_400
+    history_retention_1m: PositiveInt = 1_209_600
+    history_retention_1h: PositiveInt = 31_536_000
+
+    peers: List[HttpUrl] = []
+    peer_url: HttpUrl | None = None
+    peer_token: str | None = None
 
     class Config:
         """Environment variables configuration."""
@@ -242,6 +262,26 @@ class EnvConfig(PydanticEnvConfig):
         extra = "forbid"
         hide_input_in_errors = True
 
+    @model_validator(mode="after")
+    def validate_peers(self) -> "EnvConfig":
+        """Validate that a sharded instance knows its own URL among the peers, and the token shared with them."""
+        if self.peers:
+            if self.peer_url not in self.peers:
+                raise ValueError("peer_url must be one of the peers")
+            if not self.peer_token:
+                raise ValueError("peer_token is required to relay targets between peers")
+        return self
+
+    @model_validator(mode="after")
+    def validate_git_sources(self) -> "EnvConfig":
+        """Fold ``git_org`` into the sources of runners, and validate that each is an organization or a repository."""
+        if self.git_org and self.git_org not in self.git_sources:
+            self.git_sources.insert(0, self.git_org)
+        for source in self.git_sources:
+            if not re.fullmatch(r"[\w.-]+(/[\w.-]+)?", source):
+                raise ValueError(f"git_sources must be an organization or an 'owner/repo', got {source!r}")
+        return self
+
     @classmethod
     def from_env_file(cls, filename: pathlib.Path | str) -> "EnvConfig":
         """Create an instance of EnvConfig from environment file.
@@ -305,5 +345,38 @@ def env_loader(**kwargs) -> EnvConfig:
     return load_kwargs(**kwargs)
 
 
+def share(config: EnvConfig) -> None:
+    """Hand the loaded settings over to the worker and collector processes, through their environment.
+
+    Args:
+        config: Settings loaded by the parent process.
+    """
+    os.environ[SHARED_ENV] = config.model_dump_json()
+
+
+def load_shared() -> EnvConfig:
+    """Load the settings handed over by the parent process.
+
+    Returns:
+        EnvConfig:
+        Settings of the parent process, without reading the environment or env files again.
+    """
+    return EnvConfig.model_validate_json(os.environ[SHARED_ENV])
+
+
+def index_targets(config: EnvConfig) -> None:
+    """Flatten the targets into plain dictionaries, and index them by their base URL.
+
+    Args:
+        config: Settings whose targets are indexed.
+    """
+    global targets_by_url
+    config.targets = [{k: str(v) for k, v in target.model_dump().items()} for target in config.targets]
+    targets_by_url = {t["base_url"]: t for t in config.targets}
+
+
+# Environment variable holding the settings shared with the worker and collector processes
+SHARED_ENV = "PYOBSERVABILITY_SETTINGS"
+
 env: EnvConfig
 targets_by_url: Dict[str, Dict[str, str]]
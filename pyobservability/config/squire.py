@@ -1,6 +1,12 @@
+import json
 from typing import Any, Dict, Optional
 from urllib.parse import urlencode
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def urljoin(*args, params: Optional[Dict[str, Any]] = None) -> str:
     """Joins given arguments into a URL and optionally adds query parameters.
@@ -19,3 +25,35 @@ def urljoin(*args, params: Optional[Dict[str, Any]] = None) -> str:
         return f"{base_url}?{query_string}"
 
     return base_url
+
+
+def dumps(obj: Any) -> str:
+    """Serializes an object to compact JSON, using ``orjson`` when it is installed.
+
+    Args:
+        obj: Object to serialize.
+
+    Returns:
+        str: JSON encoded string.
+    """
+    if orjson:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson is stricter than json (e.g. non-str keys, big integers)
+            pass
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def loads(data: bytes | str) -> Any:
+    """Deserializes JSON, using ``orjson`` when it is installed.
+
+    Args:
+        data: JSON encoded bytes or string.
+
+    Returns:
+        Any: Deserialized object.
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
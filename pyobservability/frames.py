@@ -0,0 +1,253 @@
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Tuple
+
+from pyobservability.config import squire
+
+# Every n-th frame of a stream is sent in full, so delta subscribers resynchronize periodically
+KEYFRAME_INTERVAL = 20
+# Compression level for app-level zlib frames, trading a little ratio for speed
+ZLIB_LEVEL = 6
+# Binary layout of a frame passed between processes, the sequence number and the byte length of each text field
+PACKED = struct.Struct("!Q5I")
+ABSENT = 0xFFFFFFFF
+
+
+@dataclass
+class Frame:
+    """Stream message serialized once and shared by every subscriber.
+
+    >>> Frame
+
+    """
+
+    type: str
+    text: str
+    entry: str | None = None
+    seq: int = 0
+    _delta: str | None = field(default=None, repr=False)
+    _delta_text: str | None = field(default=None, repr=False)
+    # payloads the delta is computed from, until a delta subscriber first asks for it
+    _changes: Tuple[str, str, Dict[str, Any], Dict[str, Any], float] | None = field(
+        default=None, repr=False, compare=False
+    )
+    _cache: Dict[Tuple[str, bool], bytes] = field(default_factory=dict, repr=False, compare=False)
+    # built in this process, so the time a frame waits for its subscribers is local even when relayed
+    published: float = field(default_factory=time.perf_counter, repr=False, compare=False)
+
+    @classmethod
+    def metrics(
+        cls,
+        name: str,
+        base_url: str,
+        payload: Dict[str, Any],
+        ts: float,
+        seq: int = 0,
+        previous: Dict[str, Any] | None = None,
+    ) -> "Frame":
+        """Build a metrics frame for a single node.
+
+        Args:
+            name: Name of the node.
+            base_url: Base URL of the node.
+            payload: Metrics payload received from the node.
+            ts: Event loop time when the payload was received.
+            seq: Sequence number of the payload within its stream.
+            previous: Payload preceding this one in the stream, used to encode the delta.
+
+        Returns:
+            Frame:
+            Frame holding the encoded node entry and the complete message. Unless this is a keyframe, the delta
+            entry and message are computed on first use, so streams without delta subscribers never diff.
+        """
+        entry = squire.dumps({"name": name, "base_url": base_url, "metrics": payload})
+        frame = cls(type="metrics", text=merge([entry], ts), entry=entry, seq=seq)
+        if previous is not None and seq % KEYFRAME_INTERVAL:
+            frame._changes = (name, base_url, previous, payload, ts)
+        return frame
+
+    @property
+    def delta(self) -> str | None:
+        """Encoded delta entry, or None for keyframes and frames without a preceding payload."""
+        if self._changes is not None:
+            name, base_url, previous, payload, ts = self._changes
+            self._changes = None
+            self._delta = squire.dumps({"name": name, "base_url": base_url, "delta": diff(previous, payload)})
+            self._delta_text = merge([self._delta], ts)
+        return self._delta
+
+    @property
+    def delta_text(self) -> str | None:
+        """Complete delta message, or None when the frame has no delta."""
+        return self._delta_text if self.delta is not None else None
+
+    @classmethod
+    def state(cls, name: str, base_url: str, state: str, retry_in: float | None = None) -> "Frame":
+        """Build a frame announcing the connection state of a node.
+
+        Args:
+            name: Name of the node.
+            base_url: Base URL of the node.
+            state: Connection state of the node's monitor.
+            retry_in: Seconds until the next connection attempt, when disconnected.
+
+        Returns:
+            Frame:
+            Frame holding the encoded state.
+        """
+        return cls(
+            type="state",
+            text=squire.dumps(
+                {"type": "state", "name": name, "base_url": base_url, "state": state, "retry_in": retry_in}
+            ),
+        )
+
+    def encoded(self, delta: bool = False) -> bytes:
+        """UTF-8 encoded message, cached so that it is encoded once for all subscribers.
+
+        Args:
+            delta: Encode the delta message instead of the full message.
+
+        Returns:
+            bytes:
+            Encoded message.
+        """
+        if (data := self._cache.get(("raw", delta))) is None:
+            data = self._cache["raw", delta] = (self.delta_text if delta else self.text).encode()
+        return data
+
+    def compressed(self, delta: bool = False) -> bytes:
+        """Zlib compressed message, cached so that it is compressed once for all subscribers.
+
+        Args:
+            delta: Compress the delta message instead of the full message.
+
+        Returns:
+            bytes:
+            Compressed message.
+        """
+        if (data := self._cache.get(("zlib", delta))) is None:
+            data = self._cache["zlib", delta] = zlib.compress(self.encoded(delta), ZLIB_LEVEL)
+        return data
+
+    def packed(self) -> bytes:
+        """Binary form of the frame to pass it to another process, cached so that it is packed once.
+
+        Returns:
+            bytes:
+            Header followed by the UTF-8 encoded type, message, entry, delta entry and delta message.
+        """
+        if (data := self._cache.get(("packed", False))) is None:
+            parts = [
+                part.encode() if part is not None else None
+                for part in (self.type, self.text, self.entry, self.delta, self.delta_text)
+            ]
+            header = PACKED.pack(self.seq, *(ABSENT if part is None else len(part) for part in parts))
+            data = self._cache["packed", False] = header + b"".join(part for part in parts if part)
+        return data
+
+    @classmethod
+    def unpack(cls, header: bytes, body: bytes) -> "Frame":
+        """Rebuild a frame from its binary form.
+
+        Args:
+            header: Header of the packed frame.
+            body: Text fields following the header, of ``packed_size(header)`` bytes.
+
+        Returns:
+            Frame:
+            Frame with the same encoded message, entry and delta as the packed one.
+        """
+        seq, *sizes = PACKED.unpack(header)
+        parts, offset = [], 0
+        for size in sizes:
+            if size == ABSENT:
+                parts.append(None)
+                continue
+            end = offset + size
+            parts.append(body[offset:end])
+            offset = end
+        kind, text, entry, delta, delta_text = (part.decode() if part is not None else None for part in parts)
+        frame = cls(type=kind, text=text, entry=entry, seq=seq, _delta=delta, _delta_text=delta_text)
+        # the received bytes are the encoded messages, so they are not encoded again
+        frame._cache["raw", False] = parts[1]
+        if parts[4] is not None:
+            frame._cache["raw", True] = parts[4]
+        return frame
+
+
+def packed_size(header: bytes) -> int:
+    """Length of the text fields following the header of a packed frame.
+
+    Args:
+        header: Header of the packed frame.
+
+    Returns:
+        int:
+        Number of bytes to read after the header.
+    """
+    return sum(size for size in PACKED.unpack(header)[1:] if size != ABSENT)
+
+
+def merge(entries: Iterable[str], ts: float) -> str:
+    """Compose a metrics message from pre-encoded node entries, without serializing them again.
+
+    Args:
+        entries: Encoded node entries.
+        ts: Event loop time of the message.
+
+    Returns:
+        str:
+        Encoded metrics message.
+    """
+    return '{"type":"metrics","ts":%r,"data":[%s]}' % (ts, ",".join(entries))
+
+
+def diff(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute the changes between two payloads of the same node.
+
+    Args:
+        previous: Payload the client already has.
+        current: Payload to be represented.
+
+    Returns:
+        Dict[str, Any]:
+        Delta with ``set`` (changed keys), ``unset`` (removed keys) and ``rows`` (changed rows of tables,
+        as the new table length ``n`` and the changed rows in ``set`` keyed by index).
+    """
+    changed, rows = {}, {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if old == value and key in previous:
+            continue
+        if isinstance(value, list) and isinstance(old, list) and value and isinstance(value[0], dict):
+            updated = {str(idx): row for idx, row in enumerate(value) if idx >= len(old) or old[idx] != row}
+            # replacing the whole table is cheaper once most of its rows have changed
+            if len(updated) <= len(value) // 2:
+                rows[key] = {"n": len(value), "set": updated}
+                continue
+        changed[key] = value
+    delta = {}
+    if changed:
+        delta["set"] = changed
+    if unset := [key for key in previous if key not in current]:
+        delta["unset"] = unset
+    if rows:
+        delta["rows"] = rows
+    return delta
+
+
+def annotate(entry: str, **fields) -> str:
+    """Prepend fields to an encoded node entry, without decoding it.
+
+    Args:
+        entry: Encoded node entry.
+        **fields: Fields to be added to the entry.
+
+    Returns:
+        str:
+        Encoded node entry with the additional fields.
+    """
+    return "{" + squire.dumps(fields)[1:-1] + "," + entry[1:]
@@ -1,47 +1,24 @@
+import asyncio
+import contextlib
 import logging
+import time
 from collections.abc import Generator
 from dataclasses import dataclass, fields
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-import requests
-from requests.auth import AuthBase
-from requests.models import PreparedRequest
+import aiohttp
 
 from pyobservability.config import settings, squire
+from pyobservability.snapshots import Snapshot
 
 LOGGER = logging.getLogger("uvicorn.default")
 
-
-class BearerAuth(AuthBase):
-    # This doc string has URL split into multiple lines
-    """Instantiates ``BearerAuth`` object.
-
-    >>> BearerAuth
-
-    Args:
-        token: Token for bearer auth.
-
-    References:
-        `New Forms of Authentication <https://requests.readthedocs.io/en/latest/user/authentication/#new
-        -forms-of-authentication>`__
-    """
-
-    def __init__(self, token: str):
-        """Initializes the class and assign object members."""
-        self.token = token
-
-    def __call__(self, request: PreparedRequest) -> PreparedRequest:
-        """Override built-in.
-
-        Args:
-            request: Takes prepared request as an argument.
-
-        Returns:
-            PreparedRequest:
-            Returns the request after adding the auth header.
-        """
-        request.headers["authorization"] = "Bearer " + self.token
-        return request
+# Largest page size allowed by the GitHub API
+PER_PAGE = 100
+# Sources of runners fetched at once
+CONCURRENCY = 4
+# Seconds a request waits for the first refresh of the runners
+READY_TIMEOUT = 10
 
 
 @dataclass
@@ -59,6 +36,7 @@ class Runner:
     busy: bool = None
     labels: List[str] = None
     version: str = None
+    source: str = None
 
     def __post_init__(self):
         """Add 'v' prefix only if it doesn't already exist in the version string."""
@@ -67,6 +45,20 @@ class Runner:
                 self.version = f"v{self.version}"
 
 
+@dataclass
+class Source:
+    """Source dataclass to represent the latest fetch of an organization's or a repository's runners.
+
+    >>> Source
+
+    """
+
+    name: str
+    latency: float
+    runners: int = 0
+    error: str | None = None
+
+
 @dataclass
 class Runners:
     """Runners dataclass to represent a collection of GitHub Actions runners.
@@ -76,7 +68,7 @@ class Runners:
     """
 
     total: int
-    runners: Generator[Runner]
+    runners: List[Runner]
 
 
 class GitHub:
@@ -84,20 +76,45 @@ class GitHub:
 
     >>> GitHub
 
+    Notes:
+        The runners of every organization and repository in ``git_sources`` are fetched concurrently, and merged.
+        Pages are revalidated with their ETag, which GitHub does not count against the rate limit when unchanged.
+        The runners are refreshed every ``git_interval`` seconds by the scheduler, into a snapshot served to every
+        request. So GitHub is asked as often regardless of the number of viewers.
     """
 
-    SESSION = requests.Session()
-
     def __init__(self):
-        """Initializes the session and loads the bearer auth with Git token."""
-        self.SESSION.auth = BearerAuth(token=settings.env.git_token)
+        """Initializes the session with the Git token."""
+        self.session = aiohttp.ClientSession(
+            headers={
+                "Authorization": f"Bearer {settings.env.git_token}",
+                "Accept": "application/vnd.github+json",
+            },
+            timeout=aiohttp.ClientTimeout(connect=3, sock_read=3),
+        )
+        # ETag, body and next page's URL of every page, keyed by the page's URL
+        self.pages: Dict[str, Tuple[str, Dict[str, Any], str | None]] = {}
+        # runners of every source, as of its latest successful fetch
+        self.by_source: Dict[str, List[Runner]] = {}
+        self.cached: Runners | None = None
+        self.snapshot: Snapshot | None = None
+        self.version = 0
+        # latency and outcome of every source, as of the latest refresh
+        self.sources: List[Source] = []
+        # set once the first refresh completes, successful or not
+        self.ready = asyncio.Event()
+
+    async def close(self) -> None:
+        """Close the session."""
+        await self.session.close()
 
     @staticmethod
-    def parser(runners_info: List[Dict[str, Any]]) -> Generator[Runner]:
+    def parser(runners_info: List[Dict[str, Any]], source: str) -> Generator[Runner]:
         """Parses the runners information from the GitHub API response.
 
         Args:
             runners_info: Runners information as a list of dictionaries from the GitHub API response.
+            source: Organization or repository the runners belong to.
 
         Yields:
             Runner:
@@ -108,27 +125,124 @@ class GitHub:
                 (label["name"] for label in runner["labels"] if label["name"] != "self-hosted"),
                 key=lambda s: s.lower(),
             )
-            kwargs = {**runner, **{"labels": labels}}
+            kwargs = {**runner, **{"labels": labels, "source": source}}
             field_names = [f.name for f in fields(Runner)]
             if missing := set(field_names) - set(kwargs.keys()):
                 LOGGER.warning("Missing field(s) in runner information: %s", missing)
             kwargs = {k: v for k, v in kwargs.items() if k in field_names}
             yield Runner(**kwargs)
 
-    def runners(self) -> Runners | None:
-        """Fetches the runners information from the GitHub API.
+    async def get_page(self, url: str) -> Tuple[Dict[str, Any], str | None]:
+        """Fetches a page from the GitHub API, revalidating the cached page with its ETag.
+
+        Args:
+            url: URL of the page.
 
         Returns:
-            Runners | None:
-            Returns a Runners object containing the total count and a list of Runner objects,
+            Tuple[Dict[str, Any], str | None]:
+            Returns the page's body, and the URL of the next page if any.
         """
-        try:
-            response = self.SESSION.get(
-                squire.urljoin(settings.env.git_url, "orgs", settings.env.git_org, "actions", "runners"), timeout=(3, 3)
-            )
+        cached = self.pages.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        async with self.session.get(url, headers=headers) as response:
+            # unchanged page, along with its link to the next page which is not sent again
+            if cached and response.status == 304:
+                return cached[1], cached[2]
             response.raise_for_status()
-            response_json = response.json()
-        except (requests.RequestException, requests.JSONDecodeError) as error:
-            LOGGER.error(error)
-            return None
-        return Runners(total=response_json["total_count"], runners=self.parser(response_json["runners"]))
+            body = await response.json()
+            next_page = str(link["url"]) if (link := response.links.get("next")) else None
+            if etag := response.headers.get("ETag"):
+                self.pages[url] = etag, body, next_page
+            return body, next_page
+
+    async def fetch(self, source: str) -> List[Runner]:
+        """Fetches every page of a source's runners from the GitHub API.
+
+        Args:
+            source: Organization, or repository as ``owner/repo``.
+
+        Returns:
+            List[Runner]:
+            Returns the runners of the source.
+        """
+        scope = ("repos", *source.split("/")) if "/" in source else ("orgs", source)
+        url = f"{squire.urljoin(settings.env.git_url, *scope, 'actions', 'runners')}?per_page={PER_PAGE}"
+        runners: List[Runner] = []
+        while url:
+            body, url = await self.get_page(url)
+            runners.extend(self.parser(body["runners"], source))
+        return runners
+
+    async def fetch_source(self, source: str, semaphore: asyncio.Semaphore) -> Source:
+        """Fetches a source's runners, keeping its previous runners when the fetch fails.
+
+        Args:
+            source: Organization, or repository as ``owner/repo``.
+            semaphore: Bounds the sources fetched at once.
+
+        Returns:
+            Source:
+            Returns the latency and outcome of the fetch.
+        """
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                self.by_source[source] = await self.fetch(source)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as error:
+                LOGGER.error("Unable to retrieve runners of '%s' from GitHub: %s", source, error)
+                reason = str(error) or type(error).__name__
+                return Source(name=source, latency=time.perf_counter() - start, error=reason)
+            return Source(name=source, latency=time.perf_counter() - start, runners=len(self.by_source[source]))
+
+    async def refresh(self) -> None:
+        """Refreshes the runners from every source concurrently, and publishes a new snapshot when they changed."""
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        sources = await asyncio.gather(*(self.fetch_source(source, semaphore) for source in settings.env.git_sources))
+        for source in sources:
+            LOGGER.debug("Fetched [%d] runners of '%s' in %.3fs", source.runners, source.name, source.latency)
+        if self.by_source:
+            # a runner visible from several sources is listed once, under the first source configured
+            merged: Dict[int, Runner] = {}
+            for source in settings.env.git_sources:
+                for runner in self.by_source.get(source, []):
+                    merged.setdefault(runner.id, runner)
+            self.cached = Runners(total=len(merged), runners=list(merged.values()))
+            snapshot = Snapshot.build(self.version + 1, [runner.__dict__ for runner in self.cached.runners])
+            if not self.snapshot or snapshot.etag != self.snapshot.etag:
+                self.snapshot, self.version = snapshot, snapshot.version
+                LOGGER.debug("Published version [%d] of the runners - %d found", self.version, self.cached.total)
+        self.sources = sources
+        self.ready.set()
+
+    async def get_snapshot(self) -> Snapshot | None:
+        """Latest snapshot of the runners, waiting for the first refresh only until ``READY_TIMEOUT``.
+
+        Returns:
+            Snapshot | None:
+            Returns the latest snapshot of the runners, None when the runners have never been retrieved.
+        """
+        if not self.ready.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.ready.wait(), READY_TIMEOUT)
+        return self.snapshot
+
+
+def server_timing(sources: List[Source]) -> str:
+    """Server-Timing header reporting the latest fetch of every source.
+
+    Args:
+        sources: Latest fetch of every source.
+
+    Returns:
+        str:
+        Value of the Server-Timing header, with a metric per source.
+    """
+    metrics = []
+    for idx, source in enumerate(sources):
+        desc = source.name if source.error is None else f"{source.name} (error: {source.error})"
+        desc = desc.replace("\\", "").replace('"', "'")
+        metrics.append(f'github-{idx};dur={source.latency * 1000:.1f};desc="{desc}"')
+    return ", ".join(metrics)
+
+
+GITHUB: GitHub | None = None
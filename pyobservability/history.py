@@ -0,0 +1,121 @@
+import math
+import time
+from array import array
+from typing import Any, Dict, List
+
+# Samples kept per node, matching the window of the UI charts
+HISTORY_POINTS = 60
+NAN = float("nan")
+
+
+def _number(value: Any) -> float:
+    """Convert a payload value to float, NaN when it is missing or not numeric.
+
+    Args:
+        value: Value from the payload.
+
+    Returns:
+        float:
+        Numeric value or NaN.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _listed(values: array, order: List[int]) -> List[float | None]:
+    """List the values of an array in the given order, with NaN as None.
+
+    Args:
+        values: Array to read from.
+        order: Indices to read, from oldest to newest.
+
+    Returns:
+        List[float | None]:
+        JSON friendly list of values.
+    """
+    return [None if math.isnan(value := values[idx]) else value for idx in order]
+
+
+class History:
+    """Bounded ring buffer of a node's recent numeric series, backed by arrays of doubles.
+
+    >>> History
+
+    """
+
+    SERIES = ("memory", "load_m1", "load_m5", "load_m15", "disk")
+
+    def __init__(self, capacity: int = HISTORY_POINTS):
+        """Initialize the ring buffer.
+
+        Args:
+            capacity: Number of samples kept, older samples are overwritten.
+        """
+        self.capacity = capacity
+        self.cores = 0
+        self._ts = array("d", [0.0]) * capacity
+        self._series = {name: array("d", [NAN]) * capacity for name in self.SERIES}
+        # CPU usage per core, one row of ``cores`` values per sample
+        self._cpu = array("d")
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of samples held."""
+        return self._size
+
+    @property
+    def last_ts(self) -> float:
+        """Wall clock time of the latest sample, zero when empty."""
+        return self._ts[self._next - 1] if self._size else 0.0
+
+    def append(self, payload: Dict[str, Any], ts: float | None = None) -> None:
+        """Record the numeric series of a payload.
+
+        Args:
+            payload: Metrics payload received from the node.
+            ts: Wall clock time of the payload, defaults to now.
+        """
+        cpu_usage = payload.get("cpu_usage") or []
+        if len(cpu_usage) != self.cores:
+            # core count changed (or first sample), per core history is no longer comparable
+            self.cores = len(cpu_usage)
+            self._cpu = array("d", [NAN]) * (self.capacity * self.cores)
+
+        idx = self._next
+        self._ts[idx] = time.time() if ts is None else ts
+        self._series["memory"][idx] = _number((payload.get("memory_info") or {}).get("percent"))
+        load_averages = payload.get("load_averages") or {}
+        for period in ("m1", "m5", "m15"):
+            self._series[f"load_{period}"][idx] = _number(load_averages.get(period))
+        total = used = 0.0
+        for disk in payload.get("disk_info") or []:
+            total += _number(disk.get("total") or 0)
+            used += _number(disk.get("used") or 0)
+        self._series["disk"][idx] = used / total * 100 if total > 0 else NAN
+        offset = idx * self.cores
+        for core, value in enumerate(cpu_usage):
+            self._cpu[offset + core] = _number(value)
+
+        self._next = (idx + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export the held samples, from oldest to newest.
+
+        Returns:
+            Dict[str, Any]:
+            Timestamps (epoch seconds), CPU usage per core, memory and disk percent, and load averages.
+        """
+        start = (self._next - self._size) % self.capacity
+        cores = self.cores
+        order = [(start + offset) % self.capacity for offset in range(self._size)]
+        return {
+            "ts": [self._ts[idx] for idx in order],
+            "cpu": [_listed(self._cpu[core::cores], order) for core in range(cores)],
+            "memory": _listed(self._series["memory"], order),
+            "disk": _listed(self._series["disk"], order),
+            "load": {period: _listed(self._series[f"load_{period}"], order) for period in ("m1", "m5", "m15")},
+        }
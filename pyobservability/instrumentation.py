@@ -0,0 +1,230 @@
+import asyncio
+import collections
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.exposition import choose_encoder
+
+# Toggled by the ``internal_metrics`` setting, every hook is skipped while it is off
+ENABLED = False
+
+# Internal registry, kept apart from the targets' metrics so that it is scraped only when asked for
+registry = CollectorRegistry()
+
+# Sub-millisecond buckets, as most stages take microseconds
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+target_seconds = Histogram(
+    "pyobservability_stage_seconds",
+    "Time spent in a stage of a target's stream (parse, refine, record, encode, publish)",
+    ["stage", "target"],
+    buckets=BUCKETS,
+    registry=registry,
+)
+target_bytes = Counter(
+    "pyobservability_received_bytes",
+    "Bytes of NDJSON received from a target",
+    ["target"],
+    registry=registry,
+)
+target_errors = Counter(
+    "pyobservability_parse_errors",
+    "Lines received from a target that could not be parsed",
+    ["target"],
+    registry=registry,
+)
+queue_seconds = Histogram(
+    "pyobservability_queue_wait_seconds",
+    "Time a frame waited between its publication and its send to a websocket client",
+    ["connection"],
+    buckets=BUCKETS,
+    registry=registry,
+)
+scrape_seconds = Histogram(
+    "pyobservability_scrape_render_seconds",
+    "Time spent rendering the exposition of the targets' metrics",
+    buckets=BUCKETS,
+    registry=registry,
+)
+
+# Bound children keyed by their labels, so that the hot paths skip the label lookup of prometheus_client
+_children: Dict[Tuple, Histogram | Counter] = {}
+
+
+def _child(metric: Histogram | Counter, *labels: str) -> Histogram | Counter:
+    """Child of a metric bound to its labels, looked up once per label set."""
+    key = (metric, *labels)
+    if (child := _children.get(key)) is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def clock() -> float:
+    """Start of a stage, or 0 when the internal metrics are disabled so that the stage goes unrecorded."""
+    return time.perf_counter() if ENABLED else 0.0
+
+
+def target_stage(stage: str, target: str, start: float) -> None:
+    """Record the time spent in a stage of a target's stream.
+
+    Args:
+        stage: Name of the stage.
+        target: Base URL of the target.
+        start: Start of the stage, as returned by ``clock``.
+    """
+    if start:
+        _child(target_seconds, stage, target).observe(time.perf_counter() - start)
+
+
+def received(target: str, size: int) -> None:
+    """Count the bytes received from a target."""
+    if ENABLED:
+        _child(target_bytes, target).inc(size)
+
+
+def parse_error(target: str) -> None:
+    """Count a line from a target that could not be parsed."""
+    if ENABLED:
+        _child(target_errors, target).inc()
+
+
+def queued(connection: str, published: float) -> None:
+    """Record the time a frame waited in a subscriber's queue, until it was sent.
+
+    Args:
+        connection: Address of the websocket client.
+        published: ``time.perf_counter`` at which the frame was built.
+    """
+    _child(queue_seconds, connection).observe(time.perf_counter() - published)
+
+
+def scraped(start: float) -> None:
+    """Record the time spent rendering an exposition of the targets' metrics.
+
+    Args:
+        start: Start of the rendering, as returned by ``clock``.
+    """
+    if start:
+        scrape_seconds.observe(time.perf_counter() - start)
+
+
+def forget_connection(connection: str) -> None:
+    """Remove the metrics of a websocket connection that has left.
+
+    Args:
+        connection: Address of the websocket client.
+    """
+    if _children.pop((queue_seconds, connection), None):
+        queue_seconds.remove(connection)
+
+
+class Profiler:
+    """Sampling profiler of the event loop's thread, producing collapsed stacks for flamegraphs.
+
+    >>> Profiler
+
+    Notes:
+        A background thread samples the stack of the profiled thread at a fixed interval. Nothing is traced, so the
+        profiled code runs at full speed, and the overhead is that of the sampling thread alone.
+    """
+
+    def __init__(self):
+        """Initialize the profiler."""
+        self.samples: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the profiler is sampling."""
+        return self._thread is not None
+
+    def start(self, thread_id: int, interval: float) -> None:
+        """Start sampling a thread.
+
+        Args:
+            thread_id: Identifier of the thread to sample.
+            interval: Seconds between samples.
+        """
+        self.samples.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, args=(thread_id, interval), name="pyobservability-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling.
+
+        Returns:
+            str:
+            Collapsed stacks, one ``frame;frame;frame count`` line per distinct stack with the outermost frame first,
+            as read by ``flamegraph.pl`` and speedscope.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _sample(self, thread_id: int, interval: float) -> None:
+        """Sample the stack of a thread until stopped.
+
+        Args:
+            thread_id: Identifier of the thread to sample.
+            interval: Seconds between samples.
+        """
+        while not self._stop.wait(interval):
+            if (frame := sys._current_frames().get(thread_id)) is None:
+                return
+            stack = []
+            while frame:
+                code = frame.f_code
+                stack.append(f"{code.co_qualname} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+
+PROFILER = Profiler()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Endpoint exposing PyObservability's own stage timings and counters.
+
+    Args:
+        request: FastAPI request object.
+
+    Returns:
+        Response:
+        Exposition of the internal registry in the Prometheus text or OpenMetrics format as per the ``Accept`` header.
+    """
+    encoder, content_type = choose_encoder(request.headers.get("accept", ""))
+    return Response(encoder(registry), media_type=content_type)
+
+
+async def profile_endpoint(
+    seconds: float = Query(10, gt=0, le=300), interval: float = Query(0.005, ge=0.001, le=1)
+) -> PlainTextResponse:
+    """Endpoint profiling the event loop for a while, switched on by the request and off once it completes.
+
+    Args:
+        seconds: Duration of the profile.
+        interval: Seconds between samples.
+
+    Returns:
+        PlainTextResponse:
+        Collapsed stacks of the samples, ready for ``flamegraph.pl`` or speedscope.
+    """
+    if PROFILER.running:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already being captured.")
+    PROFILER.start(threading.get_ident(), interval)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stacks = PROFILER.stop()
+    return PlainTextResponse(stacks)
@@ -0,0 +1,37 @@
+from pyobservability import github, kuma, snapshots
+from pyobservability.config import settings
+
+
+def kuma_enabled() -> bool:
+    """Whether the Uptime Kuma integration is configured."""
+    return all((settings.env.kuma_url, settings.env.kuma_username, settings.env.kuma_password))
+
+
+def runners_enabled() -> bool:
+    """Whether the GitHub runners integration is configured."""
+    return all((settings.env.git_sources, settings.env.git_token))
+
+
+async def start() -> None:
+    """Start the configured integrations, refreshed in the background regardless of the number of viewers."""
+    snapshots.SCHEDULER = snapshots.Scheduler()
+    if kuma_enabled():
+        # pushed by Uptime Kuma, so there is nothing to schedule
+        kuma.KUMA = kuma.UptimeKumaClient()
+        await kuma.KUMA.start()
+    if runners_enabled():
+        github.GITHUB = github.GitHub()
+        snapshots.SCHEDULER.every(settings.env.git_interval, github.GITHUB.refresh, "GitHub runners")
+
+
+async def stop() -> None:
+    """Stop the integrations that were started."""
+    if kuma.KUMA:
+        await kuma.KUMA.stop()
+        kuma.KUMA = None
+    if snapshots.SCHEDULER:
+        await snapshots.SCHEDULER.stop()
+        snapshots.SCHEDULER = None
+    if github.GITHUB:
+        await github.GITHUB.close()
+        github.GITHUB = None
@@ -0,0 +1,385 @@
+import asyncio
+import contextlib
+import json
+import logging
+import logging.config
+import multiprocessing
+import os
+import pathlib
+import signal
+import tempfile
+from typing import Any, AsyncGenerator, Dict, List, Tuple
+
+from pyobservability import github, integrations, kuma, sharding, store, transport
+from pyobservability.config import enums, settings, squire
+from pyobservability.frames import PACKED, Frame, packed_size
+from pyobservability.monitor import Monitor, RelayMonitor, Subscription
+from pyobservability.snapshots import Snapshot
+
+LOGGER = logging.getLogger("uvicorn.default")
+
+# Set in the worker processes, which relay the targets and the integrations from the collector process
+WORKER = False
+
+
+def socket_path() -> pathlib.Path:
+    """Unix socket the collector process relays the targets over.
+
+    Returns:
+        pathlib.Path:
+        Configured ``ipc_path``, or a socket in the temporary directory named after the server's port.
+    """
+    return settings.env.ipc_path or pathlib.Path(tempfile.gettempdir()) / f"pyobservability-{settings.env.port}.sock"
+
+
+async def _ask(kind: enums.IPCRequest, **fields: Any) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Send a request to the collector process.
+
+    Args:
+        kind: Type of the request.
+        **fields: Fields of the request.
+
+    Returns:
+        Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        Connection to the collector process, to read its answer from.
+    """
+    reader, writer = await asyncio.open_unix_connection(socket_path())
+    writer.write(squire.dumps({"type": kind, "pid": os.getpid(), **fields}).encode() + b"\n")
+    await writer.drain()
+    return reader, writer
+
+
+async def _fetch_snapshot(kind: enums.IPCRequest) -> Tuple[Snapshot | None, Dict[str, Any]]:
+    """Fetch the snapshot of an integration from the collector process.
+
+    Args:
+        kind: Request of the integration's snapshot.
+
+    Returns:
+        Tuple[Snapshot | None, Dict[str, Any]]:
+        Snapshot as encoded by the collector, None when it is not available, and the header it was sent with.
+    """
+    try:
+        reader, writer = await _ask(kind)
+    except OSError as error:
+        LOGGER.error("Collector process is unreachable: %s", error)
+        return None, {}
+    try:
+        header = squire.loads(await reader.readline())
+        if not header:
+            return None, header
+        return Snapshot(version=header["version"], body=await reader.read(), etag=header["etag"]), header
+    finally:
+        writer.close()
+
+
+async def health() -> Dict[str, Dict[str, Any]]:
+    """Connection state of each monitor of the collector process.
+
+    Returns:
+        Dict[str, Dict[str, Any]]:
+        State of each monitor, keyed by base URL.
+    """
+    reader, writer = await _ask(enums.IPCRequest.health)
+    try:
+        return squire.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+class KumaRelay:
+    """Uptime Kuma monitors of a worker process, served by the client of the collector process.
+
+    >>> KumaRelay
+
+    """
+
+    async def get_snapshot(self) -> Snapshot | None:
+        """Snapshot of the monitors, as encoded by the collector process.
+
+        Returns:
+            Snapshot | None:
+            Monitors with relevant fields, None when the monitor list has not been received.
+        """
+        snapshot, _ = await _fetch_snapshot(enums.IPCRequest.kuma)
+        return snapshot
+
+    async def updates(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """Updates of the monitors, relayed from the collector process.
+
+        Yields:
+            Dict[str, Any]:
+            A ``snapshot`` of every monitor, followed by an ``update`` with the changed and removed monitors.
+            Ends when the subscriber falls too far behind, so that it starts over from a snapshot.
+        """
+        reader, writer = await _ask(enums.IPCRequest.kuma_updates)
+        try:
+            while line := await reader.readline():
+                yield squire.loads(line)
+        finally:
+            writer.close()
+
+    async def stop(self) -> None:
+        """Nothing to release, the session with Uptime Kuma is held by the collector process."""
+
+
+class GitHubRelay:
+    """GitHub runners of a worker process, served by the scheduler of the collector process.
+
+    >>> GitHubRelay
+
+    """
+
+    def __init__(self):
+        """Initialize the relay."""
+        # latency and outcome of every source, as of the snapshot served last
+        self.sources: List[github.Source] = []
+
+    async def get_snapshot(self) -> Snapshot | None:
+        """Latest snapshot of the runners, as encoded by the collector process.
+
+        Returns:
+            Snapshot | None:
+            Returns the latest snapshot of the runners, None when the runners have never been retrieved.
+        """
+        snapshot, header = await _fetch_snapshot(enums.IPCRequest.runners)
+        if snapshot:
+            self.sources = [github.Source(**source) for source in header["sources"]]
+        return snapshot
+
+    async def close(self) -> None:
+        """Nothing to release, the session with GitHub is held by the collector process."""
+
+
+def relay_integrations() -> None:
+    """Serve the configured integrations of a worker process from the collector process."""
+    if integrations.kuma_enabled():
+        kuma.KUMA = KumaRelay()
+    if integrations.runners_enabled():
+        github.GITHUB = GitHubRelay()
+
+
+class IPCMonitor(RelayMonitor):
+    """Monitor of a worker process, relaying the target's frames from the collector process.
+
+    >>> IPCMonitor
+
+    """
+
+    async def _relay(self, flags: Dict[str, bool]) -> AsyncGenerator[Frame, None]:
+        """Subscribe to the variant in the collector process, and receive its frames over the Unix socket.
+
+        Args:
+            flags: Stream flags of the variant.
+
+        Yields:
+            Frame:
+            Frames published by the collector's monitor, until the collector closes the connection.
+        """
+        reader, writer = await _ask(enums.IPCRequest.stream, base_url=self.base_url, flags=flags)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(PACKED.size)
+                except asyncio.IncompleteReadError:
+                    return
+                yield Frame.unpack(header, await reader.readexactly(packed_size(header)))
+        finally:
+            writer.close()
+
+
+async def _forward(writer: asyncio.StreamWriter, monitor: Monitor, sub: Subscription) -> None:
+    """Write the frames of a subscription to a worker process.
+
+    Args:
+        writer: Connection of the worker process.
+        monitor: Monitor subscribed to.
+        sub: Subscription of the worker process.
+    """
+    if monitor.policy_of(sub.variant).state != enums.MonitorState.connected:
+        writer.write(monitor.state_frame(sub.variant).packed())
+    while True:
+        # packed once, and written as is to every worker subscribed to the variant
+        writer.write((await sub.get()).packed())
+        await writer.drain()
+
+
+async def _until_closed(reader: asyncio.StreamReader, task: asyncio.Task) -> None:
+    """Run a task answering a worker process, until either the task completes or the worker disconnects.
+
+    Args:
+        reader: Connection of the worker process.
+        task: Task writing the answer to the worker process.
+    """
+    # reads nothing more from the worker, other than the end of the connection
+    closed = asyncio.create_task(reader.read())
+    try:
+        await asyncio.wait((task, closed), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for pending in (task, closed):
+            pending.cancel()
+            with contextlib.suppress(asyncio.CancelledError, ConnectionError):
+                await pending
+
+
+async def _stream(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, target: Dict[str, str], flags: Dict[str, bool]
+) -> None:
+    """Relay a variant of a target's stream to a worker process, until either side disconnects.
+
+    Args:
+        reader: Connection of the worker process.
+        writer: Connection of the worker process, to write the frames to.
+        target: Target subscribed to.
+        flags: Stream flags of the variant.
+    """
+    # workers never disconnect for falling behind, the backpressure policy applies to their own subscribers
+    monitor, sub = await transport.subscribe(target, flags, enums.Backpressure.drop_oldest)
+    try:
+        await _until_closed(reader, asyncio.create_task(_forward(writer, monitor, sub)))
+    finally:
+        await transport.unsubscribe(monitor, sub)
+
+
+async def _send_snapshot(writer: asyncio.StreamWriter, kind: enums.IPCRequest) -> None:
+    """Write the snapshot of an integration to a worker process, as a JSON header followed by the encoded snapshot.
+
+    Args:
+        writer: Connection of the worker process.
+        kind: Request of the integration's snapshot.
+    """
+    integration = kuma.KUMA if kind == enums.IPCRequest.kuma else github.GITHUB
+    if not (integration and (snapshot := await integration.get_snapshot())):
+        writer.write(b"{}\n")
+        return
+    header = {"version": snapshot.version, "etag": snapshot.etag}
+    if kind == enums.IPCRequest.runners:
+        header["sources"] = [source.__dict__ for source in github.GITHUB.sources]
+    writer.write(squire.dumps(header).encode() + b"\n" + snapshot.body)
+    await writer.drain()
+
+
+async def _push_kuma(writer: asyncio.StreamWriter) -> None:
+    """Write the updates of the Uptime Kuma monitors to a worker process, one JSON line per update.
+
+    Args:
+        writer: Connection of the worker process.
+    """
+    if not kuma.KUMA:
+        return
+    async for update in kuma.KUMA.updates():
+        writer.write(squire.dumps(update).encode() + b"\n")
+        await writer.drain()
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Answer a request of a worker process.
+
+    Args:
+        reader: Connection of the worker process, carrying its request.
+        writer: Connection of the worker process, to write the answer to.
+    """
+    try:
+        request = squire.loads(await reader.readline())
+        kind = enums.IPCRequest(request.get("type", enums.IPCRequest.stream))
+        target = settings.targets_by_url[request["base_url"]] if kind == enums.IPCRequest.stream else None
+    except (ValueError, KeyError, TypeError, AttributeError) as error:
+        LOGGER.warning("Invalid request from a worker: %r", error)
+        writer.close()
+        return
+    try:
+        if kind == enums.IPCRequest.stream:
+            await _stream(reader, writer, target, request.get("flags") or {})
+        elif kind == enums.IPCRequest.kuma_updates:
+            await _until_closed(reader, asyncio.create_task(_push_kuma(writer)))
+        elif kind == enums.IPCRequest.health:
+            writer.write(squire.dumps(transport.health()).encode() + b"\n")
+            await writer.drain()
+        else:
+            await _send_snapshot(writer, kind)
+    except ConnectionError as error:
+        LOGGER.debug("Worker disconnected during its %s request: %s", kind, error)
+    finally:
+        writer.close()
+
+
+async def _collect() -> None:
+    """Serve the targets and the integrations to the worker processes, until the process is signalled to stop."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    # refreshed once for every worker, which serve the integrations from this process
+    await integrations.start()
+    if settings.env.history_path:
+        store.STORE = store.Store.from_env()
+        await store.STORE.start()
+        # history is recorded continuously, regardless of any worker being subscribed
+        for target in sharding.owned(settings.env.targets):
+            monitor = transport.GLOBAL_MONITORS[target["base_url"]] = Monitor(target, persistent=True)
+            await monitor.start()
+    path = socket_path()
+    path.unlink(missing_ok=True)
+    server = await asyncio.start_unix_server(_serve, path)
+    path.chmod(0o600)
+    LOGGER.info("Collector process [%d] relaying targets over %s", os.getpid(), path)
+    await stop.wait()
+    server.close()
+    for monitor in list(transport.GLOBAL_MONITORS.values()):
+        await monitor.stop()
+    await integrations.stop()
+    if store.STORE:
+        await store.STORE.stop()
+        store.STORE = None
+    path.unlink(missing_ok=True)
+    LOGGER.info("Collector process [%d] has shut down.", os.getpid())
+
+
+def configure_logging(log_config: Dict[str, Any] | str) -> None:
+    """Apply the logging configuration of the server, reading it the same way uvicorn does in the worker processes.
+
+    Args:
+        log_config: Logging configuration as a dictionary, or the path to a JSON, YAML or INI configuration file.
+    """
+    if isinstance(log_config, dict):
+        logging.config.dictConfig(log_config)
+    elif log_config.endswith(".json"):
+        with open(log_config) as file:
+            logging.config.dictConfig(json.load(file))
+    elif log_config.endswith((".yaml", ".yml")):
+        # required by uvicorn for the same file in the worker processes
+        import yaml
+
+        with open(log_config) as file:
+            logging.config.dictConfig(yaml.safe_load(file))
+    else:
+        logging.config.fileConfig(log_config, disable_existing_loggers=False)
+
+
+def collector(log_config: Dict[str, Any] | str) -> None:
+    """Entry point of the collector process, which owns the monitors of every target.
+
+    Args:
+        log_config: Logging configuration of the server, applied the same way as in the worker processes.
+    """
+    configure_logging(log_config)
+    settings.env = settings.load_shared()
+    settings.index_targets(settings.env)
+    asyncio.run(_collect())
+
+
+def spawn_collector(log_config: Dict[str, Any] | str) -> multiprocessing.Process:
+    """Start the collector process, which the worker processes relay the targets from.
+
+    Args:
+        log_config: Logging configuration of the server.
+
+    Returns:
+        multiprocessing.Process:
+        Running collector process.
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=collector, args=(log_config,), name="pyobservability-collector"
+    )
+    process.start()
+    return process
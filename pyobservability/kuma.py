@@ -1,92 +1,247 @@
+import asyncio
+import contextlib
 import logging
 import socket
-import time
 from collections.abc import Generator
-from typing import Any, Dict
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Tuple
 from urllib.parse import urlparse
 
 import socketio
+from fastapi import WebSocket, WebSocketDisconnect
 from socketio.exceptions import SocketIOError
 
-from pyobservability.config import settings
+from pyobservability.config import settings, squire
+from pyobservability.snapshots import Snapshot
 
 LOGGER = logging.getLogger("uvicorn.default")
 cache = {"private_ip": None}
 
+# Heartbeat status codes of Uptime Kuma
+STATUS = {0: "down", 1: "up", 2: "pending", 3: "maintenance"}
+# Changes queued per stream subscriber, before it is disconnected to start over from a snapshot
+STREAM_QUEUE = 100
+
+
+class KumaConfigs:
+    """Validated monitor configurations, memoized by monitor id.
+
+    >>> KumaConfigs
+
+    Notes:
+        Uptime Kuma pushes every monitor on each change, so a monitor is validated again only when its raw
+        dictionary differs from the one it was last validated from.
+    """
+
+    def __init__(self):
+        """Initialize the memo."""
+        self._memo: Dict[int, Tuple[Dict[str, Any], settings.KumaConfig]] = {}
+
+    def get(self, raw: Dict[str, Any]) -> settings.KumaConfig:
+        """Validated configuration of a monitor.
+
+        Args:
+            raw: Raw monitor from the Uptime Kuma server.
+
+        Returns:
+            settings.KumaConfig:
+            Configuration validated from the raw monitor, reused while the raw monitor is unchanged.
+        """
+        if (memo := self._memo.get(raw["id"])) and memo[0] == raw:
+            return memo[1]
+        config = settings.KumaConfig(**raw)
+        self._memo[raw["id"]] = raw, config
+        return config
+
+    def prune(self, ids: Iterable[int]) -> None:
+        """Forget the monitors that no longer exist.
+
+        Args:
+            ids: IDs of the existing monitors.
+        """
+        ids = set(ids)
+        self._memo = {key: memo for key, memo in self._memo.items() if key in ids}
+
 
 class UptimeKumaClient:
-    """Client to interact with Uptime Kuma server via Socket.IO.
+    """Long-lived client of the Uptime Kuma server via Socket.IO, keeping the monitors pushed by the server.
 
     >>> UptimeKumaClient
 
+    Notes:
+        A single session is kept for the lifetime of the server, and logged in again whenever it reconnects.
+        Uptime Kuma pushes the monitors and their heartbeats, so the monitors are always served from memory,
+        and only the monitors that changed are pushed to the stream subscribers.
     """
 
     def __init__(self):
         """Initialize the Uptime Kuma client."""
-        self.sio = socketio.Client()
-        self.monitors = {}
-        self.logged_in = False
+        # disconnected at shutdown by the lifespan, instead of the client cancelling every task on SIGINT
+        self.sio = socketio.AsyncClient(reconnection_delay_max=60, handle_sigint=False)
+        self.monitors: Dict[str, Dict[str, Any]] = {}
+        self.heartbeats: Dict[int, int] = {}
+        self.configs = KumaConfigs()
+        # processed monitors keyed by monitor id
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.ready = asyncio.Event()
+        # incremented on every change, and the snapshot of the monitors is encoded again only when it is behind
+        self.version = 0
+        self.snapshot: Snapshot | None = None
+        self._streams: List[asyncio.Queue] = []
+        self._task: asyncio.Task | None = None
+        # referenced until it completes, as the event loop keeps only weak references to tasks
+        self._login_task: asyncio.Task | None = None
 
+        self.sio.on("connect", self._on_connect)
         self.sio.on("monitorList", self._on_monitor_list)
+        self.sio.on("updateMonitorIntoList", self._on_monitor_update)
+        self.sio.on("deleteMonitorFromList", self._on_monitor_delete)
+        self.sio.on("heartbeatList", self._on_heartbeat_list)
+        self.sio.on("heartbeat", self._on_heartbeat)
+
+    async def _on_connect(self) -> None:
+        """Log in on every (re)connection, outside the handler as the login awaits the server's reply."""
+        LOGGER.info("Connected to Uptime Kuma server at %s", settings.env.kuma_url)
+        if self._login_task:
+            self._login_task.cancel()
+        self._login_task = asyncio.create_task(self.login())
 
-    def _on_monitor_list(self, data):
+    async def _on_monitor_list(self, data: Dict[str, Dict[str, Any]]) -> None:
         """Handle incoming monitor list from Uptime Kuma server."""
         LOGGER.debug("Received monitor list from Uptime Kuma server.")
         self.monitors = data
+        self._refresh()
+        self.ready.set()
 
-    def connect(self):
-        """Connect to the Uptime Kuma server via Socket.IO."""
-        LOGGER.debug("Connecting to Uptime Kuma server at %s", settings.env.kuma_url)
-        self.sio.connect(settings.env.kuma_url, wait_timeout=settings.env.kuma_timeout)
+    async def _on_monitor_update(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Handle monitors added or edited on the Uptime Kuma server."""
+        self.monitors.update(data)
+        self._refresh()
 
-    def login(self):
-        """Log in to the Uptime Kuma server."""
-        result = {"ok": False}
-
-        def callback(resp):
-            """Callback to handle login response."""
-            result.update(resp or {"ok": False})
-
-        self.sio.emit(
-            "login",
-            {
-                "username": settings.env.kuma_username,
-                "password": settings.env.kuma_password,
-                "token": "",
-            },
-            callback=callback,
-        )
+    async def _on_monitor_delete(self, monitor_id: int | str) -> None:
+        """Handle a monitor deleted from the Uptime Kuma server."""
+        self.monitors.pop(str(monitor_id), None)
+        self._refresh()
 
-        end = time.time() + settings.env.kuma_timeout
-        while not result.get("ok") and time.time() < end:
-            time.sleep(0.05)
+    async def _on_heartbeat_list(self, monitor_id: int | str, beats: List[Dict[str, Any]], *_) -> None:
+        """Handle the recent heartbeats of a monitor, sent after login."""
+        if beats:
+            self._set_status(int(monitor_id), beats[-1].get("status"))
 
-        if not result.get("ok"):
-            LOGGER.error("Uptime Kuma login failed: %s", result)
-            raise RuntimeError("Uptime Kuma login failed")
+    async def _on_heartbeat(self, beat: Dict[str, Any]) -> None:
+        """Handle a heartbeat of a monitor."""
+        self._set_status(int(beat["monitorID"]), beat.get("status"))
 
-        self.logged_in = True
+    def _set_status(self, monitor_id: int, status: int | None) -> None:
+        """Update the status of a monitor, pushing the monitor only when its status changed.
 
-    def get_monitors(self):
-        """Retrieve monitors from the Uptime Kuma server."""
-        if not self.sio.connected:
-            try:
-                self.connect()
-            except SocketIOError as error:
-                LOGGER.error("Connection to Uptime Kuma server failed: %s", error)
-                return None
+        Args:
+            monitor_id: ID of the monitor.
+            status: Status code of the monitor's latest heartbeat.
+        """
+        if self.heartbeats.get(monitor_id) == status:
+            return
+        self.heartbeats[monitor_id] = status
+        if entry := self.entries.get(monitor_id):
+            self.entries[monitor_id] = entry = {**entry, "status": STATUS.get(status)}
+            self._push({"set": [entry], "unset": []})
+
+    def _refresh(self) -> None:
+        """Process the monitors again, and push the ones that changed."""
+        entries = {entry["id"]: entry for entry in extract_monitors(self.monitors, self.configs, self.heartbeats)}
+        changed = [entry for key, entry in entries.items() if self.entries.get(key) != entry]
+        removed = [key for key in self.entries if key not in entries]
+        self.entries = entries
+        self.configs.prune(monitor["id"] for monitor in self.monitors.values())
+        if changed or removed:
+            self._push({"set": changed, "unset": removed})
 
-        if not self.logged_in:
+    def _push(self, change: Dict[str, Any]) -> None:
+        """Queue a change for every stream subscriber.
+
+        Args:
+            change: Changed monitors in ``set``, and IDs of the removed monitors in ``unset``.
+        """
+        self.version += 1
+        for queue in list(self._streams):
             try:
-                self.login()
-            except RuntimeError:
-                return None
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # ends the subscriber's stream, the browser reconnects and starts over from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                self._streams.remove(queue)
 
-        end = time.time() + settings.env.kuma_timeout
-        while not self.monitors and time.time() < end:
-            time.sleep(0.05)
+    async def login(self) -> None:
+        """Log in to the Uptime Kuma server."""
+        try:
+            result = await self.sio.call(
+                "login",
+                {
+                    "username": settings.env.kuma_username,
+                    "password": settings.env.kuma_password,
+                    "token": "",
+                },
+                timeout=settings.env.kuma_timeout,
+            )
+        except SocketIOError as error:
+            LOGGER.error("Uptime Kuma login failed: %s", error)
+            return
+        if not (result or {}).get("ok"):
+            LOGGER.error("Uptime Kuma login failed: %s", result)
+
+    async def start(self) -> None:
+        """Connect to the Uptime Kuma server in the background, retrying until it is reachable."""
+        LOGGER.debug("Connecting to Uptime Kuma server at %s", settings.env.kuma_url)
+        self._task = asyncio.create_task(
+            self.sio.connect(settings.env.kuma_url, wait_timeout=settings.env.kuma_timeout, retry=True)
+        )
+
+    async def stop(self) -> None:
+        """Disconnect from the Uptime Kuma server."""
+        for task in (self._task, self._login_task):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, SocketIOError):
+                    await task
+        self._task = self._login_task = None
+        await self.sio.disconnect()
+
+    async def get_snapshot(self) -> Snapshot | None:
+        """Snapshot of the monitors, waiting for the first monitor list only until ``kuma_timeout``.
 
-        return self.monitors
+        Returns:
+            Snapshot | None:
+            Monitors with relevant fields, None when the monitor list has not been received.
+        """
+        if not self.ready.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.ready.wait(), settings.env.kuma_timeout)
+        if not self.ready.is_set():
+            return None
+        # encoded once per change, and reused by every request until the next one
+        if not self.snapshot or self.snapshot.version != self.version:
+            self.snapshot = Snapshot.build(self.version, list(self.entries.values()))
+        return self.snapshot
+
+    async def updates(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """Updates of the monitors, a snapshot followed by the monitors that changed.
+
+        Yields:
+            Dict[str, Any]:
+            A ``snapshot`` of every monitor, followed by an ``update`` with the changed and removed monitors.
+            Ends when the subscriber falls too far behind, so that it starts over from a snapshot.
+        """
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE)
+        self._streams.append(queue)
+        try:
+            await self.ready.wait()
+            yield {"type": "snapshot", "data": list(self.entries.values())}
+            while (change := await queue.get()) is not None:
+                yield {"type": "update", "data": change}
+        finally:
+            if queue in self._streams:
+                self._streams.remove(queue)
 
 
 def ip_address() -> str | None:
@@ -110,11 +265,15 @@ def ip_address() -> str | None:
     return ip_address_
 
 
-def extract_monitors(payload: Dict[int, Dict[str, Any]]) -> Generator[Dict[str, Any]]:
-    """Convert raw API payload into a list of dicts with name, url, tags, host.
+def extract_monitors(
+    payload: Dict[str, Dict[str, Any]], configs: KumaConfigs | None = None, heartbeats: Dict[int, int] | None = None
+) -> Generator[Dict[str, Any]]:
+    """Convert raw API payload into a list of dicts with id, name, url, tags, host and status.
 
     Args:
         payload: Raw payload from Uptime Kuma server.
+        configs: Memo of the validated monitors, every monitor is validated when not given.
+        heartbeats: Status code of the latest heartbeat per monitor id.
 
     Yields:
         Dict[str, Any]:
@@ -137,25 +296,64 @@ def extract_monitors(payload: Dict[int, Dict[str, Any]]) -> Generator[Dict[str,
     if current_host in replacements:
         current_host = ip_address() or current_host
 
+    configs = configs or KumaConfigs()
+    heartbeats = heartbeats or {}
     for monitor_ in payload.values():
-        monitor = settings.KumaConfig(**monitor_)
+        monitor = configs.get(monitor_)
         if not monitor.active:
             LOGGER.warning("Monitor %s is disabled", monitor.name)
             continue
-        host = urlparse(monitor.url).hostname if monitor.url else None
+        url = monitor.url
+        host = urlparse(url).hostname if url else None
         if not host:
             continue
-        # If any monitor has localhost, replace it with kuma host
+        # If any monitor has localhost, replace it with kuma host, leaving the memoized config untouched
         if host in replacements:
             # 1. Replace the host in the URL with the current host
-            monitor.url = monitor.url.replace(host, current_host)
+            url = url.replace(host, current_host)
             # 2. Update the host variable to reflect the new host
             host = current_host
         yield {
+            "id": monitor.id,
             "name": monitor.name,
             "parent": grouped.get(monitor.id),
             "description": monitor.description,
-            "url": monitor.url,
+            "url": url,
             "host": host,
             "tags": [tag.name for tag in monitor.tags if "name" in tag],
+            "status": STATUS.get(heartbeats.get(monitor.id)),
         }
+
+
+KUMA: UptimeKumaClient | None = None
+
+
+async def _push_updates(websocket: WebSocket) -> None:
+    """Send the updates of the monitors to a browser.
+
+    Args:
+        websocket: FastAPI WebSocket connection.
+    """
+    async for update in KUMA.updates():
+        await websocket.send_text(squire.dumps(update))
+    # fell behind the updates, the browser reconnects and starts over from a snapshot
+    await websocket.close(code=1013, reason="Subscriber fell behind")
+
+
+async def websocket_endpoint(websocket: WebSocket) -> None:
+    """Websocket endpoint to push the monitors from Kuma server as they change.
+
+    Args:
+        websocket: FastAPI WebSocket connection.
+    """
+    await websocket.accept()
+    push = asyncio.create_task(_push_updates(websocket))
+    # reads nothing from the browser, other than the end of the connection
+    closed = asyncio.create_task(websocket.receive())
+    try:
+        await asyncio.wait((push, closed), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (push, closed):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+                await task
@@ -1,49 +1,92 @@
 import logging
 import pathlib
+import sys
+import time
 import warnings
 from collections.abc import Generator
 from contextlib import asynccontextmanager
 from datetime import datetime
 from http import HTTPStatus
-from typing import Dict
+from typing import Any, Dict
 
 import uiauth
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.routing import APIRoute, APIWebSocketRoute
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from pyobservability import (
+    github,
+    instrumentation,
+    integrations,
+    ipc,
+    kuma,
+    prometheus,
+    sharding,
+    snapshots,
+    store,
+    transport,
+)
 from pyobservability.config import enums, settings
-from pyobservability.github import GitHub
-from pyobservability.kuma import UptimeKumaClient, extract_monitors
-from pyobservability.monitor import Monitor
-from pyobservability.prometheus import metrics_endpoint
-from pyobservability.transport import GLOBAL_MONITORS, websocket_endpoint
+from pyobservability.transport import GLOBAL_MONITORS, peer_endpoint, websocket_endpoint
 from pyobservability.version import __version__
 
 LOGGER = logging.getLogger("uvicorn.default")
 logging.getLogger("uvicorn.access").addFilter(settings.HealthCheckFilter())
 
 
+def collecting() -> bool:
+    """Whether the targets are streamed in the background, regardless of any browser being attached.
+
+    Returns:
+        bool:
+        True in collector mode, or when Prometheus metrics or history storage are enabled.
+    """
+    return bool(
+        settings.env.mode == enums.Mode.collector or settings.env.prometheus_enabled or settings.env.history_path
+    )
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """Lifespan context manager to handle startup and shutdown events."""
-    static_dir = root / "static_legacy" if settings.env.legacy_ui else root / "static"
-    PyObservability.mount("/static", StaticFiles(directory=static_dir), name="static")
+    if settings.env.mode == enums.Mode.server:
+        static_dir = root / "static_legacy" if settings.env.legacy_ui else root / "static"
+        PyObservability.mount("/static", StaticFiles(directory=static_dir), name="static")
+        if ipc.WORKER:
+            # held by the collector process, so each integration is refreshed once regardless of the workers
+            ipc.relay_integrations()
+        else:
+            # integrations are refreshed in the background into snapshots, regardless of the number of viewers
+            await integrations.start()
+    if settings.env.history_path:
+        store.STORE = store.Store.from_env()
+        await store.STORE.start()
     if settings.env.prometheus_enabled:
-        LOGGER.info("Prometheus metrics endpoint is enabled. Starting monitors for configured targets.")
-        for target in settings.env.targets:
-            mon = Monitor(target)
+        # registered here, as the collector reads the monitors owned by the transport module
+        collector = prometheus.MonitorCollector(GLOBAL_MONITORS)
+        prometheus.registry.register(collector)
+    if collecting():
+        LOGGER.info("Metrics are collected in the background. Starting monitors for configured targets.")
+        # sharded instances collect only the targets they own
+        for target in sharding.owned(settings.env.targets):
+            mon = transport.MONITOR_FACTORY(target, persistent=True)
             LOGGER.info("Starting monitor for target [%s]", target["name"])
             await mon.start()
             GLOBAL_MONITORS[target["base_url"]] = mon
-    LOGGER.info("PyObservability is up and running.")
+    LOGGER.info("PyObservability is up and running in %s mode.", settings.env.mode)
     yield
-    if settings.env.prometheus_enabled:
+    if collecting():
         for monitor in GLOBAL_MONITORS.values():
             LOGGER.info("Stopping monitor for target [%s]", monitor.name)
             await monitor.stop()
+    if settings.env.prometheus_enabled:
+        prometheus.registry.unregister(collector)
+    if store.STORE:
+        await store.STORE.stop()
+        store.STORE = None
+    await integrations.stop()
     LOGGER.info("PyObservability has shut down.")
 
 
@@ -66,8 +109,8 @@ async def index(request: Request):
         TemplateResponse:
         Rendered HTML template with targets and version.
     """
-    kuma_data = [{}] if all((settings.env.kuma_url, settings.env.kuma_username, settings.env.kuma_password)) else None
-    runners_data = [{}] if all((settings.env.git_org, settings.env.git_token)) else None
+    kuma_data = [{}] if integrations.kuma_enabled() else None
+    runners_data = [{}] if integrations.runners_enabled() else None
     args = dict(
         request=request,
         kuma_data=kuma_data,
@@ -81,48 +124,87 @@ async def index(request: Request):
     return templates.TemplateResponse(request=request, name="index.html", context=args)
 
 
-async def kuma():
+async def kuma_monitors(request: Request) -> Response:
     """Kuma endpoint to retrieve monitors from Kuma server.
 
+    Args:
+        request: Request, with the ETag of the client's copy in its ``If-None-Match`` header.
+
     Returns:
-        List[Dict[str, Any]]:
-        List of monitors from Kuma server after filtering the required fields.
+        Response:
+        List of monitors from Kuma server after filtering the required fields, or 304 when unchanged.
     """
-    if kuma_data := UptimeKumaClient().get_monitors():
-        LOGGER.info("Retrieved monitors from kuma server - %d found", len(kuma_data))
-        monitors = list(extract_monitors(kuma_data))
-        LOGGER.info("Processed [%d] monitors for UI payload.", len(monitors))
-        return monitors
+    if snapshot := await kuma.KUMA.get_snapshot():
+        LOGGER.debug("Serving version [%d] of the Uptime Kuma monitors.", snapshot.version)
+        return snapshots.respond(request, snapshot)
     raise HTTPException(
         status_code=HTTPStatus.SERVICE_UNAVAILABLE.real,
         detail="Unable to retrieve data from kuma server.",
     )
 
 
-async def runners():
-    """Git runners endpoint to retrieve self-hosted runners from GitHub organization.
+async def runners(request: Request) -> Response:
+    """Git runners endpoint to retrieve self-hosted runners from GitHub organizations and repositories.
+
+    Args:
+        request: Request, with the ETag of the client's copy in its ``If-None-Match`` header.
 
     Returns:
-        List[Dict[str, Any]]:
-        List of self-hosted runners from GitHub organization after filtering the required fields.
+        Response:
+        List of self-hosted runners from every source after filtering the required fields, or 304 when unchanged.
+        The latest fetch of every source is reported in the Server-Timing header.
     """
-    if runners_data := GitHub().runners():
-        LOGGER.info("Retrieved self-hosted runners from GitHub - %d found", runners_data.total)
-        return [runner.__dict__ for runner in runners_data.runners]
+    if snapshot := await github.GITHUB.get_snapshot():
+        LOGGER.debug("Serving version [%d] of the GitHub runners.", snapshot.version)
+        return snapshots.respond(request, snapshot, **{"Server-Timing": github.server_timing(github.GITHUB.sources)})
     raise HTTPException(
         status_code=HTTPStatus.SERVICE_UNAVAILABLE.real,
         detail="Unable to retrieve data from GitHub.",
     )
 
 
-async def health() -> Dict[str, str]:
+async def history(
+    base_url: str, start: int | None = None, end: int | None = None, max_points: int = 1_000
+) -> Dict[str, Any]:
+    """History endpoint to retrieve a node's stored metrics within a time range.
+
+    Args:
+        base_url: Base URL of the node.
+        start: Start of the range in epoch seconds, defaults to a day before the end.
+        end: End of the range in epoch seconds, defaults to now.
+        max_points: Maximum number of points to return, the resolution is chosen accordingly.
+
+    Returns:
+        Dict[str, Any]:
+        Resolution used, timestamps and the CPU, memory, load and disk series.
+    """
+    if base_url not in settings.targets_by_url:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND.real, detail=f"Invalid base url: {base_url}")
+    if end is None:
+        end = int(time.time())
+    if start is None:
+        start = end - 86_400
+    if start >= end or max_points <= 0:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST.real, detail="Invalid time range or points.")
+    return await store.STORE.query(base_url, start, end, max_points, settings.env.interval)
+
+
+async def health() -> Dict[str, Any]:
     """Health check endpoint.
 
     Returns:
-        Dict[str, str]:
-        Health status.
+        Dict[str, Any]:
+        Health status, along with the connection state of each running monitor. In a worker process, the monitors
+        are those of the collector process, which streams the targets.
     """
-    return {"status": "ok"}
+    if not ipc.WORKER:
+        return {"status": "ok", "monitors": transport.health()}
+    try:
+        return {"status": "ok", "monitors": await ipc.health()}
+    except OSError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE.real, detail=f"Collector process is unreachable: {error}"
+        )
 
 
 def gather_routes() -> Generator[APIRoute | APIWebSocketRoute]:
@@ -132,15 +214,44 @@ def gather_routes() -> Generator[APIRoute | APIWebSocketRoute]:
         APIRoute | APIWebSocketRoute:
         API routes for the application.
     """
-    kuma_enabled = all((settings.env.kuma_url, settings.env.kuma_username, settings.env.kuma_password))
-    runners_enabled = all((settings.env.git_org, settings.env.git_token))
-    yield from [
-        APIRoute(
-            path=enums.APIEndpoints.health,
-            endpoint=health,
+    yield APIRoute(
+        path=enums.APIEndpoints.health,
+        endpoint=health,
+        methods=["GET"],
+        include_in_schema=False,
+    )
+    if settings.env.history_path:
+        yield APIRoute(
+            path=enums.APIEndpoints.history,
+            endpoint=history,
             methods=["GET"],
             include_in_schema=False,
-        ),
+        )
+    if settings.env.prometheus_enabled:
+        yield APIRoute(
+            endpoint=prometheus.metrics_endpoint,
+            path=enums.APIEndpoints.metrics,
+            methods=["GET"],
+        )
+    if settings.env.internal_metrics:
+        yield from [
+            APIRoute(
+                path=enums.APIEndpoints.internal_metrics,
+                endpoint=instrumentation.metrics_endpoint,
+                methods=["GET"],
+                include_in_schema=False,
+            ),
+            APIRoute(
+                path=enums.APIEndpoints.internal_profile,
+                endpoint=instrumentation.profile_endpoint,
+                methods=["GET"],
+                include_in_schema=False,
+            ),
+        ]
+    # headless collector serves no UI
+    if settings.env.mode == enums.Mode.collector:
+        return
+    yield from [
         APIRoute(
             path=enums.APIEndpoints.root,
             endpoint=index,
@@ -152,34 +263,32 @@ def gather_routes() -> Generator[APIRoute | APIWebSocketRoute]:
             endpoint=websocket_endpoint,
         ),
     ]
-    if kuma_enabled:
-        yield APIRoute(
-            path=enums.APIEndpoints.kuma,
-            endpoint=kuma,
-            methods=["GET"],
-            include_in_schema=False,
-        )
-    if runners_enabled:
+    if integrations.kuma_enabled():
+        yield from [
+            APIRoute(
+                path=enums.APIEndpoints.kuma,
+                endpoint=kuma_monitors,
+                methods=["GET"],
+                include_in_schema=False,
+            ),
+            APIWebSocketRoute(
+                path=enums.APIEndpoints.kuma_ws,
+                endpoint=kuma.websocket_endpoint,
+            ),
+        ]
+    if integrations.runners_enabled():
         yield APIRoute(
             path=enums.APIEndpoints.runners,
             endpoint=runners,
             methods=["GET"],
             include_in_schema=False,
         )
-    if settings.env.prometheus_enabled:
-        yield APIRoute(
-            endpoint=metrics_endpoint,
-            path=enums.APIEndpoints.metrics,
-            methods=["GET"],
-        )
 
 
-# noinspection PyTypeChecker
-def start(**kwargs) -> None:
-    """Start the FastAPI app with Uvicorn server."""
-    settings.env = settings.env_loader(**kwargs)
-    settings.env.targets = [{k: str(v) for k, v in target.model_dump().items()} for target in settings.env.targets]
-    settings.targets_by_url = {t["base_url"]: t for t in settings.env.targets}
+def configure() -> None:
+    """Index the targets, and add the routes to the app along with their authentication."""
+    settings.index_targets(settings.env)
+    instrumentation.ENABLED = settings.env.internal_metrics
     routes = list(gather_routes())
     if all((settings.env.username, settings.env.password)):
         uiauth.protect(
@@ -193,10 +302,51 @@ def start(**kwargs) -> None:
     else:
         warnings.warn("\n\tRunning PyObservability without any authentication mechanism.", UserWarning)
         PyObservability.routes.extend(routes)
+    if settings.env.peers:
+        # authenticated with the token shared by the peers, instead of the UI credentials
+        PyObservability.routes.append(APIWebSocketRoute(path=enums.APIEndpoints.peer_ws, endpoint=peer_endpoint))
+
+
+def create_app() -> FastAPI:
+    """App factory of the worker processes, configured with the settings shared by the parent process.
+
+    Returns:
+        FastAPI:
+        Configured app, whose monitors relay the targets from the collector process.
+    """
+    settings.env = settings.load_shared()
+    transport.MONITOR_FACTORY = ipc.IPCMonitor
+    ipc.WORKER = True
+    configure()
+    return PyObservability
+
+
+# noinspection PyTypeChecker
+def start(**kwargs) -> None:
+    """Start the FastAPI app with Uvicorn server.
+
+    Keyword Args:
+        mode: Run mode, overrides the one loaded from the environment.
+
+    Notes:
+        With multiple ``workers``, a collector process owns the monitors of every target and the integrations, and
+        relays them to the worker processes over a Unix socket. So each target is streamed, and each integration
+        refreshed, once regardless of the workers.
+    """
+    mode = kwargs.pop("mode", None)
+    settings.env = settings.env_loader(**kwargs)
+    if mode:
+        settings.env.mode = enums.Mode(mode)
+    if settings.env.mode == enums.Mode.collector and not (settings.env.prometheus_enabled or settings.env.history_path):
+        warnings.warn("\n\tCollector mode without PROMETHEUS_ENABLED or HISTORY_PATH has no consumers.", UserWarning)
+    workers = settings.env.workers if settings.env.mode == enums.Mode.server else 1
+    if workers > 1 and sys.platform == "win32":
+        warnings.warn("\n\tMultiple workers require Unix sockets, running a single worker.", UserWarning)
+        workers = 1
     uvicorn_args = dict(
         host=settings.env.host,
         port=settings.env.port,
-        app=PyObservability,
+        ws_per_message_deflate=settings.env.ws_compression == enums.Compression.deflate,
     )
     if settings.env.log:
         if settings.env.log == enums.Log.stdout:
@@ -213,4 +363,15 @@ def start(**kwargs) -> None:
         uvicorn_args["log_config"] = (
             settings.env.log_config if isinstance(settings.env.log_config, dict) else str(settings.env.log_config)
         )
-    uvicorn.run(**uvicorn_args)
+    if workers == 1:
+        configure()
+        uvicorn.run(app=PyObservability, **uvicorn_args)
+        return
+    # settings are shared as loaded, each process indexes the targets on its own
+    settings.share(settings.env)
+    collector = ipc.spawn_collector(uvicorn_args.get("log_config", uvicorn.config.LOGGING_CONFIG))
+    try:
+        uvicorn.run(app="pyobservability.main:create_app", factory=True, workers=workers, **uvicorn_args)
+    finally:
+        collector.terminate()
+        collector.join()
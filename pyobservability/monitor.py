@@ -1,19 +1,39 @@
 import asyncio
-import json
+import functools
 import logging
+import random
+import time
+from abc import ABC, abstractmethod
 from asyncio import CancelledError
 from collections.abc import Generator
-from typing import Any, AsyncGenerator, Dict, List
+from typing import Any, AsyncGenerator, Callable, Dict, List, Tuple
 
 import aiohttp
-import requests
 
-from pyobservability.config import settings, squire
-from pyobservability.prometheus import update_metrics
+from pyobservability import instrumentation, store
+from pyobservability.config import enums, settings, squire
+from pyobservability.frames import Frame
+from pyobservability.history import History
 
 LOGGER = logging.getLogger("uvicorn.default")
 OBS_PATH = "/observability"
 
+# Flags accepted by the upstream stream, and their defaults
+FLAGS = {"all_services": False}
+Variant = Tuple[Tuple[str, bool], ...]
+DEFAULT_VARIANT: Variant = tuple(sorted(FLAGS.items()))
+
+# Cached version payload per target's base_url, as (expiry, version)
+VERSIONS: Dict[str, Tuple[float, Dict[str, str]]] = {}
+VERSION_TTL = 3_600
+VERSION_RETRY = 60
+
+# Reconnect delays in seconds, and consecutive failures that open the circuit
+BACKOFF_BASE = 1
+BACKOFF_MAX = 60
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+
 
 def refine_service(service_list: List[Dict[str, Any]]) -> Generator[Dict[str, Dict[str, str]]]:
     """Refine service stats to only include relevant fields and round CPU values.
@@ -34,121 +54,390 @@ def refine_service(service_list: List[Dict[str, Any]]) -> Generator[Dict[str, Di
         yield service
 
 
+class ReconnectPolicy:
+    """Reconnection policy of a monitor, exponential backoff with jitter behind a circuit breaker.
+
+    >>> ReconnectPolicy
+
+    Notes:
+        Each failed attempt backs off exponentially with full jitter. After ``threshold`` consecutive failures the
+        circuit opens, and the target is left alone for a jittered ``cooldown``. The next attempt is a half-open
+        trial, which closes the circuit on success or opens it again on failure. Any success resets the policy.
+    """
+
+    def __init__(
+        self,
+        base: float = BACKOFF_BASE,
+        cap: float = BACKOFF_MAX,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+    ):
+        """Initialize the policy.
+
+        Args:
+            base: Delay in seconds after the first failure, doubled on each consecutive failure.
+            cap: Maximum delay in seconds while backing off.
+            threshold: Consecutive failures that open the circuit.
+            cooldown: Seconds the circuit stays open before a half-open trial.
+        """
+        self.base = base
+        self.cap = cap
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = enums.MonitorState.connecting
+        self.retry_at = 0.0
+
+    @property
+    def retry_in(self) -> float | None:
+        """Seconds until the next attempt, None while connected or connecting."""
+        if self.state in (enums.MonitorState.backing_off, enums.MonitorState.open):
+            return round(max(self.retry_at - time.monotonic(), 0), 1)
+        return None
+
+    def attempt(self) -> bool:
+        """Record the start of a connection attempt.
+
+        Returns:
+            bool:
+            True when the state changed.
+        """
+        if self.state == enums.MonitorState.open:
+            self.state = enums.MonitorState.half_open
+            return True
+        return False
+
+    def success(self) -> bool:
+        """Record a successful attempt, closing the circuit and resetting the backoff.
+
+        Returns:
+            bool:
+            True when the state changed.
+        """
+        self.failures = 0
+        if self.state == enums.MonitorState.connected:
+            return False
+        self.state = enums.MonitorState.connected
+        return True
+
+    def failure(self) -> float:
+        """Record a failed attempt.
+
+        Returns:
+            float:
+            Seconds to wait before the next attempt.
+        """
+        self.failures += 1
+        if self.state == enums.MonitorState.half_open or self.failures >= self.threshold:
+            self.state = enums.MonitorState.open
+            delay = random.uniform(self.cooldown / 2, self.cooldown)
+        else:
+            self.state = enums.MonitorState.backing_off
+            delay = random.uniform(0, min(self.cap, self.base * 2**self.failures))
+        self.retry_at = time.monotonic() + delay
+        return delay
+
+
+class SlowConsumerError(Exception):
+    """Raised to a subscriber disconnected by the ``disconnect`` backpressure policy."""
+
+
+class Subscription:
+    """Subscriber of a monitor's stream, applying its backpressure policy when it falls behind.
+
+    >>> Subscription
+
+    """
+
+    def __init__(self, variant: Variant, policy: enums.Backpressure, max_drops: int, maxsize: int = 10):
+        """Initialize the subscription with its backpressure policy.
+
+        Args:
+            variant: Variant key of the stream subscribed to.
+            policy: Backpressure policy applied when the queue is full.
+            max_drops: Consecutive frames dropped before the subscriber is disconnected, with the ``disconnect`` policy.
+            maxsize: Maximum frames waiting in the queue, coalescing keeps only the latest frame.
+        """
+        self.variant = variant
+        self.policy = policy
+        self.max_drops = max_drops
+        self.queue = asyncio.Queue(maxsize=1 if policy == enums.Backpressure.coalesce else maxsize)
+        # Frames dropped since the subscriber last caught up, reset whenever it reads a frame
+        self.dropped = 0
+        # Frames dropped over the subscription's life, reported when the subscriber is disconnected
+        self.total_dropped = 0
+        self.closed = False
+        # Hook to count dropped frames elsewhere (e.g. Prometheus), called once per dropped frame
+        self.on_drop: Callable[[], None] | None = None
+
+    def put(self, frame: Frame) -> None:
+        """Queue a frame, dropping the oldest frame when the queue is full.
+
+        Args:
+            frame: Frame to be queued.
+        """
+        if self.closed:
+            return
+        if self.queue.full():
+            _ = self.queue.get_nowait()
+            self.dropped += 1
+            self.total_dropped += 1
+            if self.on_drop:
+                self.on_drop()
+            if self.policy == enums.Backpressure.disconnect and self.dropped >= self.max_drops:
+                # logged by the consumer, which knows the address of the client
+                self.closed = True
+                while not self.queue.empty():
+                    _ = self.queue.get_nowait()
+                # wakes the consumer to raise SlowConsumerError
+                self.queue.put_nowait(None)
+                return
+        self.queue.put_nowait(frame)
+
+    async def get(self) -> Frame:
+        """Wait for the next frame.
+
+        Returns:
+            Frame:
+            Next frame in the queue.
+
+        Raises:
+            SlowConsumerError:
+            When the subscriber was disconnected by its backpressure policy.
+        """
+        if (frame := await self.queue.get()) is None:
+            raise SlowConsumerError(f"dropped {self.dropped} consecutive frames, {self.total_dropped} in total")
+        self.dropped = 0
+        return frame
+
+
 class Monitor:
     """Monitor class to stream observability data from a target.
 
     >>> Monitor
 
+    Notes:
+        A single monitor is shared by every subscriber of a target. At most one upstream stream is kept per
+        distinct set of flags (variant), so subscribers with different options never restart each other's stream.
     """
 
-    def __init__(self, target: Dict[str, str] | settings.MonitorTarget):
+    def __init__(self, target: Dict[str, str] | settings.MonitorTarget, persistent: bool = False):
         """Initialize Monitor with target configuration.
 
         Args:
             target: Dictionary containing target configuration with keys 'name', 'base_url', and 'apikey'.
+            persistent: Keeps the default variant streaming even when it has no subscribers.
         """
         self.name = target["name"]
         self.base_url = target["base_url"]
         self.apikey = target["apikey"]
-        self.flags = {"all_services": False}
+        self.persistent = persistent
 
         self.session: aiohttp.ClientSession | None = None
-        self._task: asyncio.Task | None = None
-        self._stop = asyncio.Event()
+        self._version_task: asyncio.Task | None = None
+        self._streams: Dict[Variant, asyncio.Task] = {}
+        self._subscribers: Dict[Variant, List[Subscription]] = {}
+        # reconnect policy per variant, so a failing stream never changes the state of the others
+        self.policies: Dict[Variant, ReconnectPolicy] = {}
+        # recent samples of the target, replayed to new viewers
+        self.history = History()
+        # latest sample of the default variant, and when it was received
+        self.latest: Dict[str, Any] | None = None
+        self.latest_at = 0.0
 
-        self._ws_subscribers = []  # list of asyncio.Queue
         self.is_running = False
 
+    @staticmethod
+    def variant(**flags) -> Variant:
+        """Build the hashable variant key for a set of flags, filling in the defaults.
+
+        Returns:
+            Variant:
+            Sorted tuple of flag names and values, unknown flags are ignored.
+        """
+        return tuple(sorted({**FLAGS, **{k: v for k, v in flags.items() if k in FLAGS}}.items()))
+
     # ------------------------------
     # SUBSCRIBE / UNSUBSCRIBE
     # ------------------------------
-    def subscribe(self) -> asyncio.Queue:
-        """Subscribe to the monitor's data stream.
+    def subscribe(self, policy: enums.Backpressure | None = None, **flags) -> Subscription:
+        """Subscribe to the monitor's data stream matching the given flags.
+
+        Args:
+            policy: Backpressure policy of the subscriber, defaults to ``ws_backpressure``.
+            **flags: Stream flags (e.g. ``all_services``), missing ones default to ``FLAGS``.
 
         Returns:
-            asyncio.Queue:
-            Queue to receive streamed data.
+            Subscription:
+            Subscription to receive streamed data.
         """
-        q = asyncio.Queue(maxsize=10)
-        self._ws_subscribers.append(q)
-        return q
+        variant = self.variant(**flags)
+        sub = Subscription(variant, policy or settings.env.ws_backpressure, settings.env.ws_max_drops)
+        self._subscribers.setdefault(variant, []).append(sub)
+        if self.is_running:
+            self._spawn(variant)
+        return sub
 
-    def unsubscribe(self, q: asyncio.Queue) -> None:
-        """Unsubscribe from the monitor's data stream.
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Unsubscribe from the monitor's data stream, ending the variant's stream when it was the last subscriber.
 
         Args:
-            q: Queue to be removed from subscribers.
+            sub: Subscription to be removed from subscribers.
         """
-        if q in self._ws_subscribers:
-            self._ws_subscribers.remove(q)
+        variant = sub.variant
+        if sub in (subs := self._subscribers.get(variant, [])):
+            subs.remove(sub)
+            if not subs:
+                del self._subscribers[variant]
+                if not (self.persistent and variant == DEFAULT_VARIANT) and (task := self._streams.get(variant)):
+                    LOGGER.debug("Stopping %s stream for %s", dict(variant), self.name)
+                    task.cancel()
+
+    @property
+    def subscribers(self) -> int:
+        """Number of subscriptions currently attached to the monitor's data stream."""
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    @property
+    def policy(self) -> ReconnectPolicy:
+        """Reconnect policy of the default variant, or of another variant while the default is not streaming."""
+        if policy := self.policies.get(DEFAULT_VARIANT) or next(iter(self.policies.values()), None):
+            return policy
+        return ReconnectPolicy()
+
+    def policy_of(self, variant: Variant) -> ReconnectPolicy:
+        """Reconnect policy of a variant's stream, created on first use.
+
+        Args:
+            variant: Variant key of the stream.
+
+        Returns:
+            ReconnectPolicy:
+            Policy tracking the connection state of the variant's stream.
+        """
+        if (policy := self.policies.get(variant)) is None:
+            policy = self.policies[variant] = ReconnectPolicy()
+        return policy
+
+    @property
+    def lag(self) -> int:
+        """Frames waiting in the queue of the most lagging subscriber."""
+        return max((sub.queue.qsize() for subs in self._subscribers.values() for sub in subs), default=0)
 
     # ------------------------------
     # START / STOP
     # ------------------------------
+    def _spawn(self, variant: Variant) -> None:
+        """Start the upstream stream for a variant, unless it is already running.
+
+        Args:
+            variant: Variant key to start streaming.
+        """
+        if variant in self._streams:
+            return
+        task = asyncio.create_task(self._stream_target(variant))
+        self._streams[variant] = task
+        task.add_done_callback(functools.partial(self._forget, variant))
+
+    def _forget(self, variant: Variant, task: asyncio.Task) -> None:
+        """Drop a finished stream task from the running streams.
+
+        Args:
+            variant: Variant key of the finished stream.
+            task: Finished stream task.
+        """
+        if self._streams.get(variant) is task:
+            del self._streams[variant]
+        # supervised, the persistent stream is restarted unless the monitor was stopped
+        if self.is_running and self.persistent and variant == DEFAULT_VARIANT and not task.cancelled():
+            LOGGER.error("Stream for %s ended unexpectedly: %r", self.name, task.exception())
+            self._spawn(variant)
+        if variant not in self._streams:
+            self.policies.pop(variant, None)
+
     async def start(self):
         """Start the monitor's data streaming."""
-        self.is_running = True
-        if self._task:
+        if self.is_running:
             return  # already running
-
-        self._stop.clear()
+        self.is_running = True
         self.session = aiohttp.ClientSession()
 
-        self._task = asyncio.create_task(self._stream_target())
+        if self.persistent:
+            self._spawn(DEFAULT_VARIANT)
+        for variant in self._subscribers:
+            self._spawn(variant)
 
     async def stop(self):
         """Stop the monitor's data streaming."""
         self.is_running = False
-        self._stop.set()
-        if self._task:
-            self._task.cancel()
+        tasks = list(self._streams.values())
+        self._streams.clear()
+        if self._version_task:
+            tasks.append(self._version_task)
+            self._version_task = None
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
             try:
-                await self._task
+                await task
             except CancelledError:
                 pass
-            self._task = None
+        self.latest = None
 
         if self.session:
             await self.session.close()
             self.session = None
 
-    async def update_flags(self, **kwargs) -> None:
-        """Update monitor flags and restart the stream."""
-        for k, v in kwargs.items():
-            if k in self.flags:
-                self.flags[k] = v
-
-        # restart stream with new params
-        await self._restart_stream()
-
-    async def _restart_stream(self) -> None:
-        """Restart the monitor's data streaming."""
-        await self.stop()
-        await self.start()
+    # ------------------------------
+    # VERSION PROBE
+    # ------------------------------
+    @property
+    def version(self) -> Dict[str, str]:
+        """Cached Python and PyNinja version of the target, empty until the first probe completes."""
+        return VERSIONS.get(self.base_url, (0.0, {}))[1]
+
+    def _refresh_version(self) -> None:
+        """Probe the target's version in the background, when the cached version is missing or expired."""
+        expiry, _ = VERSIONS.get(self.base_url, (0.0, {}))
+        if expiry > time.monotonic() or (self._version_task and not self._version_task.done()):
+            return
+        self._version_task = asyncio.create_task(self._probe_version())
+
+    async def _probe_version(self) -> None:
+        """Fetch the target's version over the monitor's session and cache it."""
+        version, ttl = {}, VERSION_TTL
+        try:
+            async with self.session.get(
+                squire.urljoin(self.base_url, "version"), timeout=aiohttp.ClientTimeout(total=3)
+            ) as resp:
+                resp.raise_for_status()
+                version = await resp.json(content_type=None)
+            assert version.get("python_version") and version.get("pyninja_version"), "Invalid version payload received."
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            LOGGER.warning("Unable to fetch version from %s: %r", self.base_url, error)
+            version, ttl = {}, VERSION_RETRY
+        except AssertionError as debug:
+            LOGGER.debug(debug)
+            LOGGER.info("Please ensure the host [%s], has the latest PyNinja [4.9.92+] installed.", self.name)
+            version = {}
+        VERSIONS[self.base_url] = (time.monotonic() + ttl, version)
 
     # ------------------------------
     # FETCH STREAM
     # ------------------------------
-    async def _fetch_stream(self) -> AsyncGenerator[Dict[str, Any], None]:
+    async def _fetch_stream(self, flags: Dict[str, bool]) -> AsyncGenerator[Dict[str, Any], None]:
         """Fetch the observability data stream from the target.
 
+        Args:
+            flags: Stream flags to request from the target.
+
         Yields:
             Dict[str, Any]:
             Parsed observability data.
         """
-        version = {}
-        try:
-            version = requests.get(squire.urljoin(self.base_url, "version"), timeout=(3, 3)).json()
-            assert version.get("python_version") and version.get("pyninja_version"), "Invalid version payload received."
-        except (requests.RequestException, requests.JSONDecodeError) as error:
-            LOGGER.warning(error)
-        except AssertionError as debug:
-            LOGGER.debug(debug)
-            LOGGER.info("Please ensure the host [%s], has the latest PyNinja [4.9.92+] installed.", self.name)
+        self._refresh_version()
 
-        params = {"interval": settings.env.interval, "all_services": "false"}
-        if self.flags["all_services"]:
-            params["all_services"] = "true"
+        params = {"interval": settings.env.interval, "all_services": "true" if flags["all_services"] else "false"}
         url = squire.urljoin(self.base_url, OBS_PATH, params=params)
         headers = {"Accept": "application/json", "Authorization": f"Bearer {self.apikey}"}
 
@@ -160,79 +449,215 @@ class Monitor:
                 return
 
             async for raw in resp.content:
-                line = raw.decode().strip()
+                line = raw.strip()
                 if not line:
                     continue
 
+                instrumentation.received(self.base_url, len(raw))
                 try:
-                    parsed = {**json.loads(line), **version}
+                    start = instrumentation.clock()
+                    parsed = squire.loads(line)
+                    instrumentation.target_stage("parse", self.base_url, start)
+                    parsed.update(self.version)
                     try:
                         if service_stats := parsed.get("service_stats"):
+                            start = instrumentation.clock()
                             parsed["service_stats"] = list(refine_service(service_stats))
+                            instrumentation.target_stage("refine", self.base_url, start)
                     except Exception as error:
                         LOGGER.error("Received [%s: %s] when parsing services for %s", type(error), error, self.name)
                     yield parsed
-                except json.JSONDecodeError:
+                except ValueError:
+                    instrumentation.parse_error(self.base_url)
                     LOGGER.debug("Bad JSON from %s: %s", self.base_url, line)
 
     # ------------------------------
     # STREAM LOOP
     # ------------------------------
-    async def _stream_target(self) -> None:
-        """Stream observability data from the target and notify subscribers."""
-        errors = {}
-        while not self._stop.is_set():
+    def _publish(self, variant: Variant, frame: Frame) -> None:
+        """Push a frame to every subscriber of a variant, as per their backpressure policy.
+
+        Args:
+            variant: Variant key of the stream that produced the frame.
+            frame: Encoded frame to publish.
+        """
+        start = instrumentation.clock()
+        for sub in list(self._subscribers.get(variant, [])):
+            sub.put(frame)
+        instrumentation.target_stage("publish", self.base_url, start)
+
+    def _record(self, payload: Dict[str, Any]) -> None:
+        """Add a payload to the history and the store, once per interval regardless of how many variants are streaming.
+
+        Args:
+            payload: Metrics payload received from the target.
+        """
+        now = time.time()
+        if now - self.history.last_ts >= settings.env.interval / 2:
+            self.history.append(payload, now)
+            if store.STORE:
+                store.STORE.record(self.base_url, now, payload)
+
+    def _announce(self, variant: Variant) -> None:
+        """Publish the connection state of a variant's stream to its subscribers.
+
+        Args:
+            variant: Variant key of the stream.
+        """
+        LOGGER.debug("Monitor for %s %s is %s", self.name, dict(variant), self.policy_of(variant).state)
+        self._publish(variant, self.state_frame(variant))
+
+    def state_frame(self, variant: Variant) -> Frame:
+        """Frame announcing the current connection state of a variant's stream.
+
+        Args:
+            variant: Variant key of the stream.
+        """
+        policy = self.policy_of(variant)
+        return Frame.state(self.name, self.base_url, policy.state, policy.retry_in)
+
+    async def _stream_target(self, variant: Variant) -> None:
+        """Stream observability data from the target and notify the variant's subscribers.
+
+        Args:
+            variant: Variant key whose flags are requested from the target.
+
+        Notes:
+            The stream reconnects as per the variant's ``ReconnectPolicy``, and keeps retrying as long as the
+            variant is subscribed. Subscribers are notified whenever the connection state changes.
+        """
+        flags = dict(variant)
+        policy = self.policy_of(variant)
+        seq, previous = 0, None
+        while self.is_running:
+            if policy.attempt():
+                self._announce(variant)
+            received = False
             try:
-                async for payload in self._fetch_stream():
-                    result = {
-                        "type": "metrics",
-                        "ts": asyncio.get_event_loop().time(),
-                        "data": [
-                            {
-                                "name": self.name,
-                                "base_url": self.base_url,
-                                "metrics": payload,
-                            }
-                        ],
-                    }
-                    update_metrics(
-                        {
-                            "name": self.name,
-                            "base_url": self.base_url,
-                            "metrics": payload,
-                        }
-                    )
-                    for q in list(self._ws_subscribers):
-                        try:
-                            q.put_nowait(result)
-                        except asyncio.QueueFull:
-                            _ = q.get_nowait()
-                            q.put_nowait(result)
+                async for payload in self._fetch_stream(flags):
+                    if not received:
+                        received = True
+                        if policy.success():
+                            self._announce(variant)
+                    if variant == DEFAULT_VARIANT:
+                        # exported to Prometheus at scrape time
+                        self.latest, self.latest_at = payload, time.monotonic()
+                    start = instrumentation.clock()
+                    self._record(payload)
+                    instrumentation.target_stage("record", self.base_url, start)
+                    seq += 1
+                    # a persistent stream without viewers only feeds the history and the exporter, so no frame is built
+                    if self._subscribers.get(variant):
+                        # serialized once, every subscriber receives the same encoded frame
+                        start = instrumentation.clock()
+                        frame = Frame.metrics(
+                            self.name, self.base_url, payload, asyncio.get_running_loop().time(), seq, previous
+                        )
+                        instrumentation.target_stage("encode", self.base_url, start)
+                        self._publish(variant, frame)
+                    previous = payload
             except Exception as err:
-                if errors.get(self.base_url):
-                    if errors[self.base_url] < 10:
-                        LOGGER.debug("Stream error for %s: %s", self.base_url, err)
-                        errors[self.base_url] += 1
+                error = err
+            else:
+                if received:
+                    # upstream session ended after a successful stream, reconnect right away
+                    continue
+                error = "no data received"
+            delay = policy.failure()
+            LOGGER.warning("Stream error for %s [%s], retrying in %.1fs: %s", self.base_url, policy.state, delay, error)
+            self._announce(variant)
+            await asyncio.sleep(delay)
+
+
+class RelayMonitor(Monitor, ABC):
+    """Monitor relaying the encoded frames of a monitor that streams the target elsewhere.
+
+    >>> RelayMonitor
+
+    Notes:
+        Subclasses implement ``_relay`` to receive a variant's frames from the owner of the target's stream.
+        Frames are fanned out to the local subscribers as received, without being encoded again. The state of the
+        monitor follows the remote monitor, its own reconnect policy applies only while the relay is down.
+    """
+
+    @abstractmethod
+    def _relay(self, flags: Dict[str, bool]) -> AsyncGenerator[Frame, None]:
+        """Receive the frames of a variant from the owner of the target's stream.
+
+        Args:
+            flags: Stream flags of the variant.
+
+        Yields:
+            Frame:
+            Frames published by the remote monitor, until the relay ends.
+        """
+
+    def _record(self, payload: Dict[str, Any]) -> None:
+        """Add a payload to the history, the store is written by the owner of the target's stream.
+
+        Args:
+            payload: Metrics payload received from the target.
+        """
+        now = time.time()
+        if now - self.history.last_ts >= settings.env.interval / 2:
+            self.history.append(payload, now)
+
+    def _observe(self, variant: Variant, frame: Frame) -> None:
+        """Keep the latest sample and the history from a relayed metrics frame, decoding it only when needed.
+
+        Args:
+            variant: Variant key of the stream that relayed the frame.
+            frame: Relayed metrics frame.
+        """
+        due = time.time() - self.history.last_ts >= settings.env.interval / 2
+        if variant != DEFAULT_VARIANT and not due:
+            return
+        payload = squire.loads(frame.entry)["metrics"]
+        if variant == DEFAULT_VARIANT:
+            self.latest, self.latest_at = payload, time.monotonic()
+        self._record(payload)
+
+    def _mirror(self, variant: Variant, frame: Frame) -> None:
+        """Take over the connection state announced by the remote monitor.
+
+        Args:
+            variant: Variant key of the stream that relayed the frame.
+            frame: Relayed state frame.
+        """
+        state = squire.loads(frame.text)
+        policy = self.policy_of(variant)
+        policy.state = enums.MonitorState(state["state"])
+        policy.retry_at = time.monotonic() + (state["retry_in"] or 0)
+
+    async def _stream_target(self, variant: Variant) -> None:
+        """Relay a variant's frames to its subscribers, reconnecting the relay as per the variant's policy.
+
+        Args:
+            variant: Variant key of the stream to relay.
+        """
+        flags = dict(variant)
+        policy = self.policy_of(variant)
+        while self.is_running:
+            if policy.attempt():
+                self._announce(variant)
+            received = False
+            try:
+                async for frame in self._relay(flags):
+                    received = True
+                    if frame.type == "state":
+                        self._mirror(variant, frame)
                     else:
-                        LOGGER.error("Stream error for %s: %s", self.base_url, err)
-
-                        # notify subscribers before stopping
-                        error_msg = {
-                            "type": "error",
-                            "base_url": self.base_url,
-                            "message": f"{self.name!r} is unreachable.",
-                        }
-
-                        for q in list(self._ws_subscribers):
-                            try:
-                                q.put_nowait(error_msg)
-                            except asyncio.QueueFull as warn:
-                                LOGGER.warning(warn)
-                                _ = q.get_nowait()
-                                q.put_nowait(error_msg)
-                        await self.stop()
-                        return
-                else:
-                    errors[self.base_url] = 1
-
-            await asyncio.sleep(1)
+                        if policy.success():
+                            self._announce(variant)
+                        self._observe(variant, frame)
+                    self._publish(variant, frame)
+            except Exception as err:
+                error = err
+            else:
+                if received:
+                    continue
+                error = "relay closed"
+            delay = policy.failure()
+            LOGGER.warning("Relay error for %s [%s], retrying in %.1fs: %s", self.base_url, policy.state, delay, error)
+            self._announce(variant)
+            await asyncio.sleep(delay)
@@ -1,22 +1,45 @@
+import asyncio
+import gzip
 import secrets
-from typing import Any, Dict, NoReturn
+import time
+from collections.abc import Generator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NoReturn, Tuple
 
-from fastapi import Depends, HTTPException, Response, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from prometheus_client import (
-    CONTENT_TYPE_LATEST,
-    CollectorRegistry,
-    Gauge,
-    generate_latest,
-)
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.exposition import choose_encoder, gzip_accepted
 
+from pyobservability import instrumentation, sharding
 from pyobservability.config import settings
 
+if TYPE_CHECKING:
+    from pyobservability.monitor import Monitor, Subscription
+
 security = HTTPBasic()
 
-# Collector registry and dynamic gauges store
+# Intervals after which a node's latest sample is no longer exported
+STALE_INTERVALS = 3
+GZIP_LEVEL = 6
+
+# Collector registry
 registry = CollectorRegistry()
-gauges: Dict[str, Gauge] = {}
+
+# Stream metrics of the subscribers, aggregated per target so that reconnecting clients add no series
+subscriber_dropped_frames = Counter(
+    "pyobservability_subscriber_dropped_frames",
+    "Frames dropped by the backpressure policy of the websocket subscribers of a target",
+    ["target"],
+    registry=registry,
+)
+subscriber_send_seconds = Histogram(
+    "pyobservability_subscriber_send_seconds",
+    "Time taken to send a frame to a websocket client",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+    registry=registry,
+)
 
 
 def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) -> None | NoReturn:
@@ -36,52 +59,259 @@ def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) ->
         )
 
 
-def flatten_payload(node: str, data: dict, parent_keys: list[str] = None) -> None:
-    """Recursively traverse the payload and push numeric values to Prometheus.
+@dataclass(frozen=True, eq=False)
+class MetricSpec:
+    """Maps a PyNinja payload field to a metric family.
+
+    >>> MetricSpec
+
+    Notes:
+        Fields of a dict section (``memory_info``) are exported with the ``node`` label only. Rows of a list section
+        (``disk_info``) get an extra label, named by ``label`` and valued by the first of ``keys`` present in the
+        row, or by the row's index when no keys are given. Rows whose ``label`` is not unique (several processes of
+        the same name) also get the labels of ``extra``, each valued by a field of the row.
+    """
+
+    name: str
+    documentation: str
+    section: str
+    field: str | None = None
+    label: str | None = None
+    keys: Tuple[str, ...] = ()
+    extra: Tuple[Tuple[str, str], ...] = ()
+
+
+SPECS: Tuple[MetricSpec, ...] = (
+    MetricSpec("cpu_usage_percent", "CPU usage per core", "cpu_usage", label="core"),
+    MetricSpec("memory_total_bytes", "Total physical memory", "memory_info", "total"),
+    MetricSpec("memory_available_bytes", "Memory available without swapping", "memory_info", "available"),
+    MetricSpec("memory_used_bytes", "Memory in use", "memory_info", "used"),
+    MetricSpec("memory_free_bytes", "Memory not in use", "memory_info", "free"),
+    MetricSpec("memory_usage_percent", "Memory usage", "memory_info", "percent"),
+    MetricSpec("swap_total_bytes", "Total swap memory", "swap_info", "total"),
+    MetricSpec("swap_used_bytes", "Swap memory in use", "swap_info", "used"),
+    MetricSpec("swap_free_bytes", "Swap memory not in use", "swap_info", "free"),
+    MetricSpec("swap_usage_percent", "Swap memory usage", "swap_info", "percent"),
+    MetricSpec("load_average_1m", "Load average over 1 minute", "load_averages", "m1"),
+    MetricSpec("load_average_5m", "Load average over 5 minutes", "load_averages", "m5"),
+    MetricSpec("load_average_15m", "Load average over 15 minutes", "load_averages", "m15"),
+    MetricSpec("disk_total_bytes", "Total disk space", "disk_info", "total", "disk", ("name", "id")),
+    MetricSpec("disk_used_bytes", "Disk space in use", "disk_info", "used", "disk", ("name", "id")),
+    MetricSpec("disk_free_bytes", "Disk space not in use", "disk_info", "free", "disk", ("name", "id")),
+    MetricSpec("service_cpu_percent", "CPU usage of a service", "service_stats", "CPU", "service", ("Name", "pname")),
+    MetricSpec("service_threads", "Threads of a service", "service_stats", "Threads", "service", ("Name", "pname")),
+    MetricSpec(
+        "service_open_files", "Open files of a service", "service_stats", "Open Files", "service", ("Name", "pname")
+    ),
+    MetricSpec(
+        "process_cpu_percent", "CPU usage of a process", "process_stats", "CPU", "process", ("Name",), (("pid", "PID"),)
+    ),
+    MetricSpec(
+        "process_threads", "Threads of a process", "process_stats", "Threads", "process", ("Name",), (("pid", "PID"),)
+    ),
+    MetricSpec(
+        "process_open_files",
+        "Open files of a process",
+        "process_stats",
+        "Open Files",
+        "process",
+        ("Name",),
+        (("pid", "PID"),),
+    ),
+    MetricSpec(
+        "container_cpu_percent", "CPU usage of a container", "docker_stats", "CPU", "container", ("Container Name",)
+    ),
+    MetricSpec(
+        "container_memory_percent",
+        "Memory usage of a container",
+        "docker_stats",
+        "Memory",
+        "container",
+        ("Container Name",),
+    ),
+)
+
 
-    Handles nested dicts and lists of numbers or dicts.
+def number(value: Any) -> float | None:
+    """Read a numeric value from the payload, including percentages rendered as text.
 
     Args:
-        node: The node identifier for labeling metrics.
-        data: The current level of the payload to process.
-        parent_keys: List of parent keys to build metric names from.
+        value: Value from the payload.
+
+    Returns:
+        float | None:
+        Numeric value, or None when the value is missing or not numeric.
     """
-    for key, value in data.items():
-        metric_path = parent_keys or [] + [key]
-
-        if isinstance(value, (int, float)):
-            # numeric value → create/update gauge
-            metric_name = "_".join(metric_path).lower()
-            if metric_name not in gauges:
-                gauges[metric_name] = Gauge(metric_name, f"Metric for {metric_name}", ["node"], registry=registry)
-            gauges[metric_name].labels(node=node).set(value)
-
-        elif isinstance(value, dict):
-            flatten_payload(node, value, metric_path)
-
-        elif isinstance(value, list):
-            for idx, item in enumerate(value):
-                if isinstance(item, (int, float)):
-                    metric_name = "_".join(metric_path + [str(idx)]).lower()
-                    if metric_name not in gauges:
-                        gauges[metric_name] = Gauge(
-                            metric_name, f"Metric for {metric_name}", ["node"], registry=registry
-                        )
-                    gauges[metric_name].labels(node=node).set(item)
-                elif isinstance(item, dict):
-                    flatten_payload(node, item, metric_path + [str(idx)])
-
-
-def update_metrics(payload: Dict[str, Any]) -> None:
-    """Push metrics dynamically from a payload.
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.endswith("%"):
+        try:
+            return float(value[:-1])
+        except ValueError:
+            return None
+    return None
+
+
+def collect(
+    payload: Dict[str, Any], limit: int, dropped: Dict[str, int]
+) -> Generator[Tuple[MetricSpec, Tuple[str, ...], float]]:
+    """Extract the exported series of a payload, as per the declarative mapping.
 
     Args:
-        payload: The payload containing metrics data, expected to have a "node" key and various nested metrics.
+        payload: Metrics payload received from the node.
+        limit: Maximum number of label sets per metric, rows beyond it are dropped.
+        dropped: Number of rows dropped by the limit per metric, updated in place.
+
+    Yields:
+        Tuple[MetricSpec, Tuple[str, ...], float]:
+        Metric, values of its extra labels and the sample value.
     """
-    node = payload.get("node", "unknown")
-    flatten_payload(node, payload)
+    for spec in SPECS:
+        section = payload.get(spec.section)
+        if not section:
+            continue
+        if spec.label is None:
+            if (value := number(section.get(spec.field))) is not None:
+                yield spec, (), value
+            continue
+        exported, rejected = 0, 0
+        for idx, row in enumerate(section):
+            if spec.keys:
+                if not isinstance(row, dict):
+                    continue
+                label = next((str(row[key]) for key in spec.keys if row.get(key) is not None), str(idx))
+                labels = (label, *(str(row.get(key, "")) for _, key in spec.extra))
+                value = number(row.get(spec.field))
+            else:
+                labels, value = (str(idx),), number(row)
+            if value is None:
+                continue
+            # only the rows that would have been exported count as dropped
+            if exported == limit:
+                rejected += 1
+                continue
+            exported += 1
+            yield spec, labels, value
+        if rejected:
+            dropped[spec.name] = rejected
+
+
+class MonitorCollector:
+    """Builds the node metrics at scrape time, from the latest sample held by each monitor.
+
+    >>> MonitorCollector
+
+    Notes:
+        Monitors only keep their latest sample, so the stream loop does no Prometheus work. Samples older than
+        ``STALE_INTERVALS`` are skipped, so an unreachable node stops being exported instead of repeating its last
+        values. With sharding, only the targets owned by this instance are exported.
+    """
+
+    def __init__(self, monitors: Dict[str, "Monitor"]):
+        """Initialize the collector.
 
+        Args:
+            monitors: Running monitors keyed by their target's base URL.
+        """
+        self.monitors = monitors
 
-async def metrics_endpoint():
-    """Endpoint for Prometheus to scrape metrics."""
-    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    def describe(self) -> List[Metric]:
+        """Skip collecting at registration, node metrics are not known until a scrape."""
+        return []
+
+    def collect(self) -> Generator[Metric]:
+        """Build the metric families of every node with a fresh sample.
+
+        Yields:
+            Metric:
+            Metric family with a sample per node and label set.
+        """
+        families = {
+            spec: GaugeMetricFamily(
+                spec.name,
+                spec.documentation,
+                labels=["node", spec.label, *(name for name, _ in spec.extra)] if spec.label else ["node"],
+            )
+            for spec in SPECS
+        }
+        depth = GaugeMetricFamily(
+            "pyobservability_subscriber_queue_depth",
+            "Frames waiting to be sent to the most lagging websocket subscriber of a target",
+            labels=["target"],
+        )
+        dropped = GaugeMetricFamily(
+            "pyobservability_dropped_series",
+            "Label sets not exported as the metric reached its cardinality limit for a node",
+            labels=["metric", "node"],
+        )
+        now = time.monotonic()
+        for monitor in list(self.monitors.values()):
+            depth.add_metric([monitor.base_url], monitor.lag)
+            # a target relayed from its owning peer is exported by that peer
+            if not sharding.owns(monitor.base_url):
+                continue
+            if not monitor.latest or now - monitor.latest_at > settings.env.interval * STALE_INTERVALS:
+                continue
+            drops = {}
+            for spec, labels, value in collect(monitor.latest, settings.env.prometheus_max_series, drops):
+                families[spec].add_metric([monitor.name, *labels], value)
+            for name, count in drops.items():
+                dropped.add_metric([name, monitor.name], count)
+        yield from families.values()
+        yield depth
+        yield dropped
+
+
+def track_subscriber(target: str, sub: "Subscription") -> None:
+    """Count the frames dropped for a websocket subscriber.
+
+    Args:
+        target: Base URL of the target subscribed to.
+        sub: Subscription of the websocket to the target's monitor.
+    """
+    sub.on_drop = subscriber_dropped_frames.labels(target).inc
+
+
+# Rendered expositions and their expiry keyed by content type and compression, reused within the same interval
+expositions: Dict[Tuple[str, bool], Tuple[float, bytes]] = {}
+
+
+def render(encoder: Callable[[CollectorRegistry], bytes], gzipped: bool) -> bytes:
+    """Render the registry in the negotiated format.
+
+    Args:
+        encoder: Exposition encoder chosen for the scrape's ``Accept`` header.
+        gzipped: Compresses the exposition with gzip.
+
+    Returns:
+        bytes:
+        Exposition body.
+    """
+    start = instrumentation.clock()
+    body = encoder(registry)
+    instrumentation.scraped(start)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL) if gzipped else body
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Endpoint for Prometheus to scrape metrics.
+
+    Args:
+        request: FastAPI request object.
+
+    Returns:
+        Response:
+        Exposition in the Prometheus text or OpenMetrics format as per the ``Accept`` header, gzip compressed when
+        the ``Accept-Encoding`` header allows it.
+    """
+    encoder, content_type = choose_encoder(request.headers.get("accept", ""))
+    gzipped = gzip_accepted(request.headers.get("accept-encoding", ""))
+    expiry, body = expositions.get((content_type, gzipped), (0.0, b""))
+    if (now := time.monotonic()) >= expiry:
+        # rendered off the event loop, so a large scrape doesn't stall the websocket streams
+        body = await asyncio.to_thread(render, encoder, gzipped)
+        expositions[(content_type, gzipped)] = (now + settings.env.interval, body)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type=content_type, headers=headers)
@@ -0,0 +1,164 @@
+import bisect
+import functools
+import hashlib
+from typing import AsyncGenerator, Dict, Iterable, List
+
+import aiohttp
+
+from pyobservability.config import enums, settings, squire
+from pyobservability.frames import PACKED, Frame
+from pyobservability.monitor import Monitor, RelayMonitor
+
+# Points per peer on the hash ring, so that targets spread evenly and move minimally when peers change
+REPLICAS = 100
+# Length of the fixed header leading every packed frame relayed by a peer
+HEADER = PACKED.size
+
+
+def _hash(key: str) -> int:
+    """Position of a key on the hash ring, stable across processes and instances.
+
+    Args:
+        key: Key to be placed on the ring.
+
+    Returns:
+        int:
+        64-bit position on the ring.
+    """
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring assigning keys to nodes.
+
+    >>> HashRing
+
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = REPLICAS):
+        """Place the nodes on the ring.
+
+        Args:
+            nodes: Nodes to assign keys to.
+            replicas: Points placed on the ring for each node.
+        """
+        self._ring = sorted((_hash(f"{node}#{idx}"), node) for node in nodes for idx in range(replicas))
+        self._positions = [position for position, _ in self._ring]
+
+    def owner(self, key: str) -> str:
+        """Node owning a key, the first one clockwise from the key's position.
+
+        Args:
+            key: Key to be assigned.
+
+        Returns:
+            str:
+            Node owning the key.
+        """
+        idx = bisect.bisect(self._positions, _hash(key)) % len(self._ring)
+        return self._ring[idx][1]
+
+
+@functools.cache
+def ring() -> HashRing:
+    """Hash ring of the configured peers, built once."""
+    return HashRing(str(peer) for peer in settings.env.peers)
+
+
+def owner(base_url: str) -> str | None:
+    """Peer owning a target, None when sharding is disabled.
+
+    Args:
+        base_url: Base URL of the target.
+
+    Returns:
+        str | None:
+        Base URL of the owning peer.
+    """
+    if not settings.env.peers:
+        return None
+    return ring().owner(base_url)
+
+
+def owns(base_url: str) -> bool:
+    """Whether this instance streams a target itself.
+
+    Args:
+        base_url: Base URL of the target.
+
+    Returns:
+        bool:
+        True when sharding is disabled, or when this instance owns the target.
+    """
+    return owner(base_url) in (None, str(settings.env.peer_url))
+
+
+def owned(targets: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Targets streamed by this instance itself.
+
+    Args:
+        targets: Configured targets.
+
+    Returns:
+        List[Dict[str, str]]:
+        Targets owned by this instance, all of them when sharding is disabled.
+    """
+    return [target for target in targets if owns(target["base_url"])]
+
+
+class PeerMonitor(RelayMonitor):
+    """Monitor relaying a target's frames from the peer instance owning it.
+
+    >>> PeerMonitor
+
+    """
+
+    def __init__(self, target: Dict[str, str], peer: str, persistent: bool = False):
+        """Initialize the monitor with the owning peer.
+
+        Args:
+            target: Dictionary containing target configuration with keys 'name', 'base_url', and 'apikey'.
+            peer: Base URL of the peer instance owning the target.
+            persistent: Keeps the default variant relaying even when it has no subscribers.
+        """
+        super().__init__(target, persistent)
+        self.peer = peer
+
+    async def _relay(self, flags: Dict[str, bool]) -> AsyncGenerator[Frame, None]:
+        """Subscribe to the variant on the owning peer, and receive its frames over the peer websocket.
+
+        Args:
+            flags: Stream flags of the variant.
+
+        Yields:
+            Frame:
+            Frames published by the peer's monitor, until the peer closes the websocket.
+        """
+        async with self.session.ws_connect(
+            squire.urljoin(self.peer, enums.APIEndpoints.peer_ws),
+            headers={"Authorization": f"Bearer {settings.env.peer_token}"},
+            heartbeat=30,
+        ) as ws:
+            await ws.send_str(squire.dumps({"base_url": self.base_url, "flags": flags}))
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.BINARY:
+                    header, body = msg.data[:HEADER], msg.data[HEADER:]
+                    yield Frame.unpack(header, body)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    raise ws.exception()
+
+
+def monitor_for(target: Dict[str, str], persistent: bool = False) -> Monitor:
+    """Build the monitor of a target, relaying from the owning peer when another instance owns it.
+
+    Args:
+        target: Dictionary containing target configuration with keys 'name', 'base_url', and 'apikey'.
+        persistent: Keeps the default variant streaming even when it has no subscribers.
+
+    Returns:
+        Monitor:
+        Monitor streaming the target, or relaying it from its owner.
+    """
+    if owns(target["base_url"]):
+        return Monitor(target, persistent)
+    return PeerMonitor(target, owner(target["base_url"]), persistent)
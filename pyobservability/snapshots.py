@@ -0,0 +1,112 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, List
+
+from fastapi import Request, Response
+
+from pyobservability.config import squire
+
+LOGGER = logging.getLogger("uvicorn.default")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Snapshot dataclass to represent a version of an integration's data, encoded once for every request.
+
+    >>> Snapshot
+
+    """
+
+    version: int
+    body: bytes
+    etag: str
+
+    @classmethod
+    def build(cls, version: int, data: Any) -> "Snapshot":
+        """Encode the data of a version.
+
+        Args:
+            version: Version of the data, incremented on every change.
+            data: Data to be served.
+
+        Returns:
+            Snapshot:
+            Snapshot with the encoded data, tagged by its content so that the tag holds across restarts and workers.
+        """
+        body = squire.dumps(data).encode()
+        return cls(version=version, body=body, etag=f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+
+
+def respond(request: Request, snapshot: Snapshot, **headers: str) -> Response:
+    """Serve a snapshot, or confirm that the client already has it.
+
+    Args:
+        request: Request, with the ETag of the client's copy in its ``If-None-Match`` header.
+        snapshot: Snapshot to be served.
+        headers: Additional headers of the response.
+
+    Returns:
+        Response:
+        304 when the client's copy is current, the encoded snapshot otherwise.
+    """
+    # revalidated on every use, so browsers send If-None-Match on their own
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", **headers}
+    tags = [tag.strip().removeprefix("W/") for tag in request.headers.get("If-None-Match", "").split(",")]
+    if snapshot.etag in tags or "*" in tags:
+        return Response(status_code=HTTPStatus.NOT_MODIFIED.real, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+class Scheduler:
+    """Scheduler refreshing the integrations in the background, regardless of the number of viewers.
+
+    >>> Scheduler
+
+    """
+
+    def __init__(self):
+        """Initialize the scheduler."""
+        self._tasks: List[asyncio.Task] = []
+
+    def every(self, interval: int, job: Callable[[], Awaitable[Any]], name: str) -> None:
+        """Run a job right away, and then once every interval.
+
+        Args:
+            interval: Seconds between the start of consecutive runs.
+            job: Coroutine function refreshing an integration.
+            name: Name of the job, for logging.
+        """
+        self._tasks.append(asyncio.create_task(self._run(interval, job, name), name=name))
+
+    @staticmethod
+    async def _run(interval: int, job: Callable[[], Awaitable[Any]], name: str) -> None:
+        """Run a job periodically, until the scheduler is stopped.
+
+        Args:
+            interval: Seconds between the start of consecutive runs.
+            job: Coroutine function refreshing an integration.
+            name: Name of the job, for logging.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            try:
+                await job()
+            except Exception as error:
+                LOGGER.error("Scheduled refresh of %s failed: %s", name, error)
+            await asyncio.sleep(max(0.0, interval - (loop.time() - start)))
+
+    async def stop(self) -> None:
+        """Cancel the jobs."""
+        for task in self._tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+
+SCHEDULER: Scheduler | None = None
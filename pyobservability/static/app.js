@@ -6,6 +6,8 @@
     // CONFIG
     // ------------------------------------------------------------
     const MAX_POINTS = 60;
+    // Stream protocol: 2 receives a full snapshot per node, followed by deltas
+    const PROTOCOL = 2;
     const targets = window.MONITOR_TARGETS || [];
     const DEFAULT_PAGE_SIZE = 10;
     const panelSpinners = {};
@@ -17,13 +19,12 @@
     // Tab management
     let currentTab = 'nodes';
     let ws = null;
-    let kumaMapData = null;
-    let kumaMapLoaded = false;
+    let kumaStream = null;
     let runnersData = null;
     let runnersDataLoaded = false;
+    let runnersEtag = null;
 
     // Interval management
-    let kumaIntervalId = null;
     let runnersIntervalId = null;
 
     // ------------------------------------------------------------
@@ -427,17 +428,18 @@
         const rows = [];
         monitors.forEach(monitor => {
             // If description is a URL, hyperlink it
-            if (monitor.description && typeof monitor.description === "string" &&
-                /^https?:\/\//.test(monitor.description.trim())) {
-                monitor.description = `<a href="${monitor.description.trim()}" target="_blank">${monitor.description.trim()}</a>`;
+            let description = monitor.description;
+            if (description && typeof description === "string" && /^https?:\/\//.test(description.trim())) {
+                description = `<a href="${description.trim()}" target="_blank">${description.trim()}</a>`;
             }
             rows.push({
                 Host: monitor.host,
                 Name: monitor.name,
                 Parent: monitor.parent || "—",
                 URL: `<a href="${monitor.url}" target="_blank">${monitor.url}</a>`,
-                Description: monitor.description || "-",
-                Tags: (monitor.tags || []).join(", ")
+                Description: description || "-",
+                Tags: (monitor.tags || []).join(", "),
+                Status: monitor.status || "—"
             });
         });
         return rows;
@@ -564,7 +566,10 @@
         nodes.forEach(node => {
             const item = document.createElement("div");
             item.className = "unified-legend-item";
-            item.innerHTML = `<span class="legend-dot" style="background:${nodeColor[node.base_url]}"></span>${node.name || node.base_url}`;
+            const stale = node.stale ? ` <span class="legend-stale">(stale ${Math.round(node.age)}s)</span>` : "";
+            const link = linkState[node.base_url];
+            const state = link ? ` <span class="node-state">${describeState(link)}</span>` : "";
+            item.innerHTML = `<span class="legend-dot" style="background:${nodeColor[node.base_url]}"></span>${node.name || node.base_url}${stale}${state}`;
             unifiedLegend.appendChild(item);
         });
     }
@@ -651,7 +656,8 @@
     }
 
     function sampleForMetric(host, metric) {
-        if (!host.metrics) return null;
+        // Leave a gap instead of repeating the last known sample of a stale node
+        if (!host.metrics || host.stale) return null;
         if (metric === "memory") return host.metrics.memory_info?.percent ?? null;
         if (metric === "cpu") {
             const values = (host.metrics.cpu_usage || [])
@@ -980,6 +986,18 @@
         chart.update("none");
     }
 
+    function fillSeries(chart, labels, values, datasetIdx = 0) {
+        // Right-align the history within the chart window, padding the older end with gaps
+        const pad = Math.max(MAX_POINTS - values.length, 0);
+        chart.data.labels = Array(pad).fill("").concat(labels.slice(-MAX_POINTS));
+        chart.data.datasets[datasetIdx].data = Array(pad).fill(null).concat(values.slice(-MAX_POINTS));
+    }
+
+    function averageCores(cpu, idx) {
+        const values = cpu.map(series => series[idx]).filter(Number.isFinite);
+        return values.length ? values.reduce((a, b) => a + b, 0) / values.length : null;
+    }
+
     function num(x) {
         const n = Number(x);
         return Number.isFinite(n) ? n : null;
@@ -1015,10 +1033,10 @@
             return val;
         }
 
-        if (/\brunning\b|active.*running|^active$|^online$|\bup\s|\bhealthy\b|^idle$/.test(s)) {
+        if (/\brunning\b|active.*running|^active$|^online$|^up$|\bup\s|\bhealthy\b|^idle$/.test(s)) {
             return `<span class="status-badge status-ok">${val}</span>`;
         }
-        if (/\bfailed\b|inactive.*dead|^dead$|^offline$|\bstopped\b/.test(s)) {
+        if (/\bfailed\b|inactive.*dead|^dead$|^offline$|^down$|\bstopped\b/.test(s)) {
             return `<span class="status-badge status-error">${val}</span>`;
         }
         if (/activating|deactivating|degraded|^unknown$|^pending$|^starting\b/.test(s)) {
@@ -1027,7 +1045,7 @@
         if (/^up\s/.test(s)) {
             return `<span class="status-badge status-ok">${val}</span>`;
         }
-        if (/^exited/.test(s)) {
+        if (/^exited|^maintenance$/.test(s)) {
             return `<span class="status-badge status-neutral">${val}</span>`;
         }
         return val;
@@ -1043,11 +1061,140 @@
         if (overlay) overlay.classList.add("hidden");
     }
 
+    // ------------------------------------------------------------
+    // DELTA PROTOCOL
+    // ------------------------------------------------------------
+    // Latest full entry per node, patched in place by delta entries
+    let nodeState = {};
+
+    function applyDelta(metrics, delta) {
+        Object.assign(metrics, delta.set || {});
+        (delta.unset || []).forEach(key => delete metrics[key]);
+        Object.entries(delta.rows || {}).forEach(([key, patch]) => {
+            const rows = (metrics[key] || []).slice(0, patch.n);
+            Object.entries(patch.set).forEach(([idx, row]) => rows[idx] = row);
+            metrics[key] = rows;
+        });
+    }
+
+    function resolveEntries(list) {
+        const resolved = [];
+        for (const entry of list) {
+            if (!entry.delta) {
+                nodeState[entry.base_url] = entry;
+                resolved.push(entry);
+                continue;
+            }
+            const state = nodeState[entry.base_url];
+            // Server always sends a snapshot first, so a delta without state is never expected
+            if (!state) continue;
+            applyDelta(state.metrics, entry.delta);
+            // Staleness markers of the unified stream belong to the entry, not the node's state
+            state.age = entry.age;
+            state.stale = entry.stale;
+            resolved.push(state);
+        }
+        return resolved;
+    }
+
+    // ------------------------------------------------------------
+    // CONNECTION STATE
+    // ------------------------------------------------------------
+    // Connection state per base_url, only kept while a node is not streaming
+    let linkState = {};
+    const nodeStateEl = document.getElementById("node-state");
+
+    function describeState(state) {
+        const label = state.state.replace("_", " ");
+        return state.retry_in ? `${label}, retry in ${Math.ceil(state.retry_in)}s` : label;
+    }
+
+    function renderNodeState() {
+        const link = selectedBase === "*" ? null : linkState[selectedBase];
+        nodeStateEl.textContent = link ? describeState(link) : "";
+        nodeStateEl.classList.toggle("hidden", !link);
+    }
+
+    function handleState(state) {
+        if (state.state === "connected") delete linkState[state.base_url];
+        else linkState[state.base_url] = state;
+        renderNodeState();
+        if (selectedBase === "*" && unifiedNodes.length) renderLegend(unifiedNodes);
+    }
+
+    function selectTarget() {
+        nodeState = {};
+        linkState = {};
+        renderNodeState();
+        ws.send(JSON.stringify({
+            type: "select_target",
+            base_url: selectedBase,
+            all_services: svcGetAll.checked,
+            protocol: PROTOCOL,
+            compression: COMPRESSION
+        }));
+    }
+
+    // ------------------------------------------------------------
+    // COMPRESSED FRAMES
+    // ------------------------------------------------------------
+    // Binary frames are zlib compressed JSON, decoded natively where the browser supports it
+    const COMPRESSION = "DecompressionStream" in window ? ["zlib"] : [];
+    // Decoding is asynchronous, so messages are chained to keep them in order
+    let messageChain = Promise.resolve();
+
+    async function decodeMessage(data) {
+        if (typeof data === "string") return data;
+        const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream("deflate"));
+        return await new Response(stream).text();
+    }
+
     // ------------------------------------------------------------
     // HANDLE METRICS
     // ------------------------------------------------------------
     let firstMessage = true;
 
+    function handleBackfill(list) {
+        const timeLabels = history => history.ts.map(ts => new Date(ts * 1000).toLocaleTimeString());
+
+        if (selectedBase === "*") {
+            if (!ensureUnifiedChart(list)) return;
+            setUnifiedMode(true);
+            // The longest history provides the shared time axis
+            const longest = list.reduce((a, b) => (b.history.ts.length > a.history.ts.length ? b : a));
+            const labels = timeLabels(longest.history);
+            Object.entries(unifiedCharts).forEach(([metric, chart]) => {
+                if (!chart) return;
+                chart.data.datasets.forEach((ds, idx) => {
+                    const host = list.find(h => h.base_url === ds.meta.base_url);
+                    if (!host) return;
+                    const h = host.history;
+                    const values = metric === "cpu" ? h.ts.map((_, i) => averageCores(h.cpu, i)) : h[metric];
+                    fillSeries(chart, labels, values, idx);
+                });
+                chart.update("none");
+            });
+            return;
+        }
+
+        const host = list.find(h => h.base_url === selectedBase);
+        if (!host) return;
+        const h = host.history;
+        const labels = timeLabels(h);
+
+        fillSeries(memChart, labels, h.memory);
+        fillSeries(cpuAvgChart, labels, h.ts.map((_, i) => averageCores(h.cpu, i)));
+        fillSeries(loadChart, labels, h.load.m1);
+        [memChart, cpuAvgChart, loadChart].forEach(chart => chart.update("none"));
+
+        pruneOldCores(h.cpu.map((_, i) => "cpu" + (i + 1)));
+        h.cpu.forEach((series, i) => {
+            const core = getCoreChart("cpu" + (i + 1));
+            fillSeries(core.chart, labels, series);
+            core.chart.update("none");
+        });
+    }
+
     function handleMetrics(list) {
         if (firstMessage) {
             hideSpinners();
@@ -1235,7 +1382,7 @@
         showAllSpinners();
         if (selectedBase !== "*") unifiedPanel.classList.add("hidden");
         if (ws) {
-            ws.send(JSON.stringify({type: "select_target", base_url: selectedBase}));
+            selectTarget();
         } else {
             alert("WebSocket not connected. Please refresh the page.");
         }
@@ -1273,8 +1420,6 @@
 
     // Control elements
     const nodeSelectLabel = document.getElementById("node-select-label");
-    const kumaIntervalSelect = document.getElementById("kuma-interval");
-    const kumaIntervalLabel = document.getElementById("kuma-interval-label");
     const runnersIntervalSelect = document.getElementById("runners-interval");
     const runnersIntervalLabel = document.getElementById("runners-interval-label");
 
@@ -1288,7 +1433,11 @@
         runnersMainTable, runnersMainThead, runnersMainTbody, 20
     ) : null;
 
+    const KUMA_COLUMNS = ["Host", "Name", "Parent", "URL", "Description", "Tags", "Status"];
+    // Monitors pushed by the server, keyed by monitor id
+    const kumaMonitors = new Map();
     let allKumaRows = [];
+    const RUNNERS_COLUMNS = ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version", "Source"];
     let allRunnersRows = [];
 
     // ------------------------------------------------------------
@@ -1301,17 +1450,22 @@
         ws = new WebSocket(`${protocol}://${location.host}/ws`);
 
         ws.onopen = () => {
-            ws.send(JSON.stringify({type: "select_target", base_url: selectedBase}));
+            selectTarget();
         };
 
+        ws.binaryType = "arraybuffer";
+
         ws.onmessage = evt => {
-            try {
-                const msg = JSON.parse(evt.data);
-                if (msg.type === "metrics") handleMetrics(msg.data);
-                if (msg.type === "error") alert(msg.message);
-            } catch (err) {
-                console.error("WS parse error:", err);
-            }
+            messageChain = messageChain.then(async () => {
+                try {
+                    const msg = JSON.parse(await decodeMessage(evt.data));
+                    if (msg.type === "backfill") handleBackfill(msg.data);
+                    if (msg.type === "metrics") handleMetrics(resolveEntries(msg.data));
+                    if (msg.type === "state") handleState(msg);
+                } catch (err) {
+                    console.error("WS parse error:", err);
+                }
+            });
         };
 
         ws.onerror = (err) => {
@@ -1331,129 +1485,122 @@
         }
     }
 
-    async function loadKumaMap() {
-        if (!PAG_KUMA_TAB) return; // Kuma tab not enabled
-
-        if (kumaMapLoaded) {
-            PAG_KUMA_TAB.setData(allKumaRows, ["Host", "Name", "Parent", "URL", "Description", "Tags"]);
-            return;
-        }
-
-        // Show loading state
-        kumaMainThead.innerHTML = '<tr><th colspan="6">Loading...</th></tr>';
-        kumaMainTbody.innerHTML = '';
-
-        try {
-            const response = await fetch('/kuma');
-            if (!response.ok) throw new Error('Failed to fetch kuma map');
-
-            kumaMapData = await response.json();
-            kumaMapLoaded = true;
-
-            allKumaRows = normalizeKumaMap(kumaMapData);
-            PAG_KUMA_TAB.setData(allKumaRows, ["Host", "Name", "Parent", "URL", "Description", "Tags"]);
-        } catch (err) {
-            console.error("Error loading Kuma map:", err);
-            kumaMainThead.innerHTML = '<tr><th>Error</th></tr>';
-            kumaMainTbody.innerHTML = '<tr><td>Error loading Kuma endpoints. Please try again.</td></tr>';
-        }
+    function filterKumaRows(searchTerm) {
+        if (!searchTerm) return allKumaRows;
+        return allKumaRows.filter(row =>
+            row.Host.toLowerCase().includes(searchTerm) ||
+            row.Name.toLowerCase().includes(searchTerm) ||
+            row.Parent.toLowerCase().includes(searchTerm) ||
+            row.URL.toLowerCase().includes(searchTerm) ||
+            row.Description.toLowerCase().includes(searchTerm) ||
+            row.Tags.toLowerCase().includes(searchTerm) ||
+            row.Status.toLowerCase().includes(searchTerm)
+        );
     }
 
-    async function refreshKumaMap() {
-        if (!PAG_KUMA_TAB) return;
+    function renderKumaRows() {
+        allKumaRows = normalizeKumaMap([...kumaMonitors.values()]);
+        // Reapply current search filter if any
+        PAG_KUMA_TAB.setData(filterKumaRows(kumaSearchInput?.value?.toLowerCase() || ''), KUMA_COLUMNS);
+    }
 
-        try {
-            const response = await fetch('/kuma');
-            if (!response.ok) throw new Error('Failed to fetch kuma map');
+    function startKumaStream() {
+        if (!PAG_KUMA_TAB || kumaStream) return; // Kuma tab not enabled, or already streaming
 
-            kumaMapData = await response.json();
-            allKumaRows = normalizeKumaMap(kumaMapData);
+        // Show loading state
+        if (!kumaMonitors.size) {
+            kumaMainThead.innerHTML = `<tr><th colspan="${KUMA_COLUMNS.length}">Loading...</th></tr>`;
+            kumaMainTbody.innerHTML = '';
+        }
 
-            // Reapply current search filter if any
-            const searchTerm = kumaSearchInput?.value?.toLowerCase() || '';
-            if (!searchTerm) {
-                PAG_KUMA_TAB.setData(allKumaRows, ["Host", "Name", "Parent", "URL", "Description", "Tags"]);
-            } else {
-                const filtered = allKumaRows.filter(row =>
-                    row.Host.toLowerCase().includes(searchTerm) ||
-                    row.Name.toLowerCase().includes(searchTerm) ||
-                    row.Parent.toLowerCase().includes(searchTerm) ||
-                    row.URL.toLowerCase().includes(searchTerm) ||
-                    row.Description.toLowerCase().includes(searchTerm) ||
-                    row.Tags.toLowerCase().includes(searchTerm)
-                );
-                PAG_KUMA_TAB.setData(filtered, ["Host", "Name", "Parent", "URL", "Description", "Tags"]);
+        // The server sends every monitor once, and then only the monitors that changed
+        const protocol = location.protocol === "https:" ? "wss" : "ws";
+        const stream = new WebSocket(`${protocol}://${location.host}/kuma/ws`);
+        kumaStream = stream;
+
+        stream.onmessage = evt => {
+            const msg = JSON.parse(evt.data);
+            if (msg.type === "snapshot") {
+                kumaMonitors.clear();
+                msg.data.forEach(monitor => kumaMonitors.set(monitor.id, monitor));
             }
-        } catch (err) {
-            console.error("Error refreshing Kuma map:", err);
-        }
-    }
+            if (msg.type === "update") {
+                msg.data.unset.forEach(id => kumaMonitors.delete(id));
+                msg.data.set.forEach(monitor => kumaMonitors.set(monitor.id, monitor));
+            }
+            renderKumaRows();
+        };
+
+        stream.onerror = (err) => {
+            console.error("Kuma stream error:", err);
+        };
 
-    function startKumaInterval() {
-        if (kumaIntervalId) clearInterval(kumaIntervalId);
-        // Default is 5m if not set
-        const interval = parseInt(kumaIntervalSelect?.value || 5_000_000);
-        kumaIntervalId = setInterval(refreshKumaMap, interval);
+        // Reconnect while on the Kuma tab, the server starts over with a snapshot
+        stream.onclose = () => {
+            if (kumaStream !== stream) return;
+            kumaStream = null;
+            if (currentTab === 'kuma') setTimeout(startKumaStream, 3000);
+        };
     }
 
-    function stopKumaInterval() {
-        if (kumaIntervalId) {
-            clearInterval(kumaIntervalId);
-            kumaIntervalId = null;
+    function stopKumaStream() {
+        if (kumaStream) {
+            const stream = kumaStream;
+            kumaStream = null;
+            stream.close();
         }
     }
 
     if (kumaSearchInput) {
         kumaSearchInput.addEventListener('input', (e) => {
-            const searchTerm = e.target.value.toLowerCase();
+            PAG_KUMA_TAB.setData(filterKumaRows(e.target.value.toLowerCase()), KUMA_COLUMNS);
+        });
+    }
 
-            if (!searchTerm) {
-                PAG_KUMA_TAB.setData(allKumaRows, ["Host", "Name", "Parent", "URL", "Description", "Tags"]);
-            } else {
-                const filtered = allKumaRows.filter(row =>
-                    row.Host.toLowerCase().includes(searchTerm) ||
-                    row.Name.toLowerCase().includes(searchTerm) ||
-                    row.Parent.toLowerCase().includes(searchTerm) ||
-                    row.URL.toLowerCase().includes(searchTerm) ||
-                    row.Description.toLowerCase().includes(searchTerm) ||
-                    row.Tags.toLowerCase().includes(searchTerm)
-                );
-                PAG_KUMA_TAB.setData(filtered, ["Host", "Name", "Parent", "URL", "Description", "Tags"]);
-            }
+    function normalizeRunners(runners) {
+        return runners.map(runner => ({
+            ID: runner.id || "—",
+            Name: runner.name || "—",
+            OS: runner.os || "—",
+            Status: runner.status || "—",
+            Busy: runner.busy ? "Yes" : "No",
+            Labels: Array.isArray(runner.labels) ? runner.labels.join(", ") : (runner.labels || "—"),
+            Version: runner.version || "—",
+            Source: runner.source || "—"
+        }));
+    }
+
+    // Conditional fetch, the server answers 304 while the runners are unchanged
+    async function fetchRunners() {
+        const response = await fetch('/runners', {
+            cache: 'no-store',
+            headers: runnersEtag ? {'If-None-Match': runnersEtag} : {}
         });
+        if (response.status === 304) return false;
+        if (!response.ok) throw new Error('Failed to fetch runners data');
+        runnersEtag = response.headers.get('ETag');
+        runnersData = await response.json();
+        allRunnersRows = normalizeRunners(runnersData);
+        return true;
     }
 
     async function loadRunnersData() {
         if (!PAG_RUNNERS_TAB) return; // Runners tab not enabled
 
         if (runnersDataLoaded) {
-            PAG_RUNNERS_TAB.setData(allRunnersRows, ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version"]);
+            PAG_RUNNERS_TAB.setData(allRunnersRows, RUNNERS_COLUMNS);
             return;
         }
 
         // Show loading state
-        runnersMainThead.innerHTML = '<tr><th colspan="6">Loading...</th></tr>';
+        runnersMainThead.innerHTML = `<tr><th colspan="${RUNNERS_COLUMNS.length}">Loading...</th></tr>`;
         runnersMainTbody.innerHTML = '';
 
         try {
-            const response = await fetch('/runners');
-            if (!response.ok) throw new Error('Failed to fetch runners data');
-
-            runnersData = await response.json();
+            await fetchRunners();
             runnersDataLoaded = true;
 
-            // Normalize runners data
-            allRunnersRows = runnersData.map(runner => ({
-                ID: runner.id || "—",
-                Name: runner.name || "—",
-                OS: runner.os || "—",
-                Status: runner.status || "—",
-                Busy: runner.busy ? "Yes" : "No",
-                Labels: Array.isArray(runner.labels) ? runner.labels.join(", ") : (runner.labels || "—"),
-                Version: runner.version || "—"
-            }));
-
-            PAG_RUNNERS_TAB.setData(allRunnersRows, ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version"]);
+            PAG_RUNNERS_TAB.setData(allRunnersRows, RUNNERS_COLUMNS);
         } catch (err) {
             console.error("Error loading runners data:", err);
             runnersMainThead.innerHTML = '<tr><th>Error</th></tr>';
@@ -1465,24 +1612,12 @@
         if (!PAG_RUNNERS_TAB) return;
 
         try {
-            const response = await fetch('/runners');
-            if (!response.ok) throw new Error('Failed to fetch runners data');
-
-            runnersData = await response.json();
-            allRunnersRows = runnersData.map(runner => ({
-                ID: runner.id || "—",
-                Name: runner.name || "—",
-                OS: runner.os || "—",
-                Status: runner.status || "—",
-                Busy: runner.busy ? "Yes" : "No",
-                Labels: Array.isArray(runner.labels) ? runner.labels.join(", ") : (runner.labels || "—"),
-                Version: runner.version || "—"
-            }));
+            if (!await fetchRunners()) return;
 
             // Reapply current search filter if any
             const searchTerm = runnersSearchInput?.value?.toLowerCase() || '';
             if (!searchTerm) {
-                PAG_RUNNERS_TAB.setData(allRunnersRows, ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version"]);
+                PAG_RUNNERS_TAB.setData(allRunnersRows, RUNNERS_COLUMNS);
             } else {
                 const filtered = allRunnersRows.filter(row =>
                     row.ID.toString().toLowerCase().includes(searchTerm) ||
@@ -1491,9 +1626,10 @@
                     row.Status.toLowerCase().includes(searchTerm) ||
                     row.Busy.toLowerCase().includes(searchTerm) ||
                     row.Labels.toLowerCase().includes(searchTerm) ||
-                    row.Version.toLowerCase().includes(searchTerm)
+                    row.Version.toLowerCase().includes(searchTerm) ||
+                    row.Source.toLowerCase().includes(searchTerm)
                 );
-                PAG_RUNNERS_TAB.setData(filtered, ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version"]);
+                PAG_RUNNERS_TAB.setData(filtered, RUNNERS_COLUMNS);
             }
         } catch (err) {
             console.error("Error refreshing runners data:", err);
@@ -1519,7 +1655,7 @@
             const searchTerm = e.target.value.toLowerCase();
 
             if (!searchTerm) {
-                PAG_RUNNERS_TAB.setData(allRunnersRows, ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version"]);
+                PAG_RUNNERS_TAB.setData(allRunnersRows, RUNNERS_COLUMNS);
             } else {
                 const filtered = allRunnersRows.filter(row =>
                     row.ID.toString().toLowerCase().includes(searchTerm) ||
@@ -1528,22 +1664,15 @@
                     row.Status.toLowerCase().includes(searchTerm) ||
                     row.Busy.toLowerCase().includes(searchTerm) ||
                     row.Labels.toLowerCase().includes(searchTerm) ||
-                    row.Version.toLowerCase().includes(searchTerm)
+                    row.Version.toLowerCase().includes(searchTerm) ||
+                    row.Source.toLowerCase().includes(searchTerm)
                 );
-                PAG_RUNNERS_TAB.setData(filtered, ["ID", "Name", "OS", "Status", "Busy", "Labels", "Version"]);
+                PAG_RUNNERS_TAB.setData(filtered, RUNNERS_COLUMNS);
             }
         });
     }
 
     // Interval change listeners
-    if (kumaIntervalSelect) {
-        kumaIntervalSelect.addEventListener('change', () => {
-            if (currentTab === 'kuma') {
-                startKumaInterval();
-            }
-        });
-    }
-
     if (runnersIntervalSelect) {
         runnersIntervalSelect.addEventListener('change', () => {
             if (currentTab === 'runners') {
@@ -1566,13 +1695,11 @@
         // Show node controls, hide others
         nodeSelect.classList.remove('hidden');
         nodeSelectLabel.classList.remove('hidden');
-        if (kumaIntervalSelect) kumaIntervalSelect.classList.add('hidden');
-        if (kumaIntervalLabel) kumaIntervalLabel.classList.add('hidden');
         if (runnersIntervalSelect) runnersIntervalSelect.classList.add('hidden');
         if (runnersIntervalLabel) runnersIntervalLabel.classList.add('hidden');
 
-        // Stop intervals
-        stopKumaInterval();
+        // Stop intervals and streams
+        stopKumaStream();
         stopRunnersInterval();
 
         // Nodes uses WS-driven first message to clear the loading overlays
@@ -1601,8 +1728,6 @@
         // Show kuma controls, hide others
         nodeSelect.classList.add('hidden');
         nodeSelectLabel.classList.add('hidden');
-        if (kumaIntervalSelect) kumaIntervalSelect.classList.remove('hidden');
-        if (kumaIntervalLabel) kumaIntervalLabel.classList.remove('hidden');
         if (runnersIntervalSelect) runnersIntervalSelect.classList.add('hidden');
         if (runnersIntervalLabel) runnersIntervalLabel.classList.add('hidden');
 
@@ -1613,9 +1738,7 @@
         setNodesLoading(false);
 
         closeWebSocket();
-        loadKumaMap().then(() => {
-            startKumaInterval();
-        });
+        startKumaStream();
     }
 
     function switchToRunnersTab() {
@@ -1636,13 +1759,11 @@
         // Show runners controls, hide others
         nodeSelect.classList.add('hidden');
         nodeSelectLabel.classList.add('hidden');
-        if (kumaIntervalSelect) kumaIntervalSelect.classList.add('hidden');
-        if (kumaIntervalLabel) kumaIntervalLabel.classList.add('hidden');
         if (runnersIntervalSelect) runnersIntervalSelect.classList.remove('hidden');
         if (runnersIntervalLabel) runnersIntervalLabel.classList.remove('hidden');
 
-        // Stop other intervals
-        stopKumaInterval();
+        // Stop other intervals and streams
+        stopKumaStream();
 
         // Leaving Nodes: always hide Nodes loading overlays so Runners doesn't look frozen
         setNodesLoading(false);
@@ -1662,7 +1783,8 @@
         if (currentTab === 'nodes' && ws && ws.readyState === WebSocket.OPEN) {
             resetUI();
         } else if (currentTab === 'kuma') {
-            refreshKumaMap();
+            stopKumaStream();
+            startKumaStream();
         } else if (currentTab === 'runners') {
             refreshRunnersData();
         }
@@ -983,6 +983,21 @@
         if (overlay) overlay.classList.add("hidden");
     }
 
+    // ------------------------------------------------------------
+    // HANDLE CONNECTION STATE
+    // ------------------------------------------------------------
+    // Nodes already reported as unreachable, so the alert is raised once until they reconnect
+    const unreachable = new Set();
+
+    function handleState(msg) {
+        if (msg.state === "connected") {
+            unreachable.delete(msg.base_url);
+        } else if (msg.state === "open" && !unreachable.has(msg.base_url)) {
+            unreachable.add(msg.base_url);
+            alert(`${msg.name} is unreachable, retrying in ${Math.ceil(msg.retry_in || 0)}s`);
+        }
+    }
+
     // ------------------------------------------------------------
     // HANDLE METRICS
     // ------------------------------------------------------------
@@ -1240,7 +1255,7 @@
             try {
                 const msg = JSON.parse(evt.data);
                 if (msg.type === "metrics") handleMetrics(msg.data);
-                if (msg.type === "error") alert(msg.message);
+                if (msg.type === "state") handleState(msg);
             } catch (err) {
                 console.error("WS parse error:", err);
             }
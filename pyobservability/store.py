@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+import logging
+import pathlib
+import sqlite3
+import time
+from typing import Any, Dict, List, Tuple
+
+from pyobservability.config import settings
+
+LOGGER = logging.getLogger("uvicorn.default")
+
+# Bucket width in seconds for each resolution, raw samples are stored as received
+RAW, MINUTE, HOUR = 0, 60, 3_600
+SERIES = ("cpu", "memory", "load", "disk")
+FLUSH_INTERVAL = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    resolution INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    cpu REAL,
+    memory REAL,
+    load REAL,
+    disk REAL,
+    PRIMARY KEY (resolution, node, ts)
+) WITHOUT ROWID
+"""
+
+ROLLUP = """
+INSERT OR REPLACE INTO samples (resolution, node, ts, cpu, memory, load, disk)
+SELECT ?, node, ts / ? * ?, avg(cpu), avg(memory), avg(load), avg(disk)
+FROM samples
+WHERE resolution = ? AND ts >= ?
+GROUP BY node, ts / ?
+"""
+
+Row = Tuple[str, int, float | None, float | None, float | None, float | None]
+
+
+def summarize(payload: Dict[str, Any]) -> Tuple[float | None, float | None, float | None, float | None]:
+    """Reduce a metrics payload to the series kept in the store.
+
+    Args:
+        payload: Metrics payload received from the node.
+
+    Returns:
+        Tuple[float | None, float | None, float | None, float | None]:
+        Average CPU usage across cores, memory percent, 1-minute load average and aggregate disk usage percent.
+    """
+    cpu_usage = [value for value in payload.get("cpu_usage") or [] if isinstance(value, (int, float))]
+    cpu = sum(cpu_usage) / len(cpu_usage) if cpu_usage else None
+    memory = (payload.get("memory_info") or {}).get("percent")
+    load = (payload.get("load_averages") or {}).get("m1")
+    total = sum(disk.get("total") or 0 for disk in payload.get("disk_info") or [])
+    used = sum(disk.get("used") or 0 for disk in payload.get("disk_info") or [])
+    disk = used / total * 100 if total else None
+    return cpu, memory, load, disk
+
+
+class Store:
+    """Embedded SQLite time-series store with rollups and retention.
+
+    >>> Store
+
+    Notes:
+        Samples are buffered in memory and written in batches off the event loop. Each flush rolls the new raw
+        samples up into 1-minute and 1-hour averages, and prunes every resolution past its retention.
+    """
+
+    def __init__(self, path: pathlib.Path | str, retention: Dict[int, int]):
+        """Initialize the store.
+
+        Args:
+            path: Path to the SQLite database file, created when missing.
+            retention: Seconds each resolution is kept for, keyed by bucket width.
+        """
+        self.path = pathlib.Path(path)
+        self.retention = retention
+        self._pending: List[Row] = []
+        self._conn: sqlite3.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls) -> "Store":
+        """Create the store configured by the environment.
+
+        Returns:
+            Store:
+            Store at ``history_path``, with the configured retention of each resolution.
+        """
+        return cls(
+            settings.env.history_path,
+            retention={
+                RAW: settings.env.history_retention_raw,
+                MINUTE: settings.env.history_retention_1m,
+                HOUR: settings.env.history_retention_1h,
+            },
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database in WAL mode, so reads never wait on the writer."""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    async def start(self) -> None:
+        """Create the database and start flushing in the background."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = await asyncio.to_thread(self._connect)
+        await asyncio.to_thread(self._conn.execute, SCHEMA)
+        self._task = asyncio.create_task(self._flush_loop())
+        LOGGER.info("Storing metrics history in %s", self.path.resolve())
+
+    async def stop(self) -> None:
+        """Flush the remaining samples and close the database."""
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._conn:
+            await self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def record(self, node: str, ts: float, payload: Dict[str, Any]) -> None:
+        """Queue a sample to be written on the next flush.
+
+        Args:
+            node: Base URL of the node.
+            ts: Wall clock time of the sample.
+            payload: Metrics payload received from the node.
+        """
+        self._pending.append((node, int(ts), *summarize(payload)))
+
+    async def flush(self) -> None:
+        """Write the buffered samples off the event loop."""
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except sqlite3.Error as error:
+            LOGGER.error("Unable to write metrics history: %s", error)
+
+    async def _flush_loop(self) -> None:
+        """Periodically write the buffered samples."""
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    def _write(self, rows: List[Row]) -> None:
+        """Write a batch of samples, then refresh the rollups and apply retention.
+
+        Args:
+            rows: Buffered samples to write.
+        """
+        since = min(row[1] for row in rows)
+        now = int(time.time())
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO samples (resolution, node, ts, cpu, memory, load, disk) "
+                f"VALUES ({RAW}, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # recompute only the buckets touched by this batch, each resolution is built from the finer one
+            for source, target in ((RAW, MINUTE), (MINUTE, HOUR)):
+                start = since // target * target
+                self._conn.execute(ROLLUP, (target, target, target, source, start, target))
+            for resolution, seconds in self.retention.items():
+                self._conn.execute("DELETE FROM samples WHERE resolution = ? AND ts < ?", (resolution, now - seconds))
+
+    def _query(self, node: str, start: int, end: int, resolution: int) -> List[Tuple]:
+        """Read a node's samples within a time range, on a dedicated connection.
+
+        Args:
+            node: Base URL of the node.
+            start: Start of the range in epoch seconds.
+            end: End of the range in epoch seconds.
+            resolution: Bucket width to read from.
+
+        Returns:
+            List[Tuple]:
+            Rows of timestamp and series values, in chronological order.
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT ts, cpu, memory, load, disk FROM samples "
+                "WHERE resolution = ? AND node = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (resolution, node, start, end),
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def resolution_for(self, start: int, end: int, max_points: int, interval: int) -> int:
+        """Choose the finest resolution that still holds the range and fits within the requested points.
+
+        Args:
+            start: Start of the range in epoch seconds.
+            end: End of the range in epoch seconds.
+            max_points: Maximum number of points the caller wants.
+            interval: Seconds between raw samples.
+
+        Returns:
+            int:
+            Bucket width to read from.
+        """
+        span, oldest = end - start, time.time() - start
+        for resolution in (RAW, MINUTE):
+            if span / (resolution or interval) <= max_points and oldest <= self.retention[resolution]:
+                return resolution
+        return HOUR
+
+    async def query(self, node: str, start: int, end: int, max_points: int, interval: int) -> Dict[str, Any]:
+        """Range query for a node's history, in columnar form.
+
+        Args:
+            node: Base URL of the node.
+            start: Start of the range in epoch seconds.
+            end: End of the range in epoch seconds.
+            max_points: Maximum number of points the caller wants.
+            interval: Seconds between raw samples.
+
+        Returns:
+            Dict[str, Any]:
+            Resolution used, timestamps and the value of each series per timestamp.
+        """
+        resolution = self.resolution_for(start, end, max_points, interval)
+        rows = await asyncio.to_thread(self._query, node, start, end, resolution)
+        columns = list(zip(*rows)) or [()] * (len(SERIES) + 1)
+        return {
+            "base_url": node,
+            "resolution": resolution,
+            "ts": list(columns[0]),
+            **{name: list(values) for name, values in zip(SERIES, columns[1:])},
+        }
+
+
+STORE: Store | None = None
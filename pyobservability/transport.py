@@ -1,128 +1,320 @@
 import asyncio
 import contextlib
+import hmac
 import json
 import logging
-from typing import Dict, List
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
 
 from fastapi import WebSocket, WebSocketDisconnect
 
-from pyobservability.config import settings
-from pyobservability.monitor import Monitor
+from pyobservability import instrumentation, prometheus, sharding
+from pyobservability.config import enums, settings, squire
+from pyobservability.frames import ZLIB_LEVEL, Frame, annotate, merge
+from pyobservability.monitor import FLAGS, Monitor, SlowConsumerError, Subscription
 
 LOGGER = logging.getLogger("uvicorn.default")
 GLOBAL_MONITORS: dict[str, Monitor] = {}
+# Builds the monitor of a target, relaying from the owning peer when sharded, or from the collector process in workers
+MONITOR_FACTORY: Callable[..., Monitor] = sharding.monitor_for
 
+# Protocol version (negotiated in ``select_target``) from which metrics are sent as deltas after a full snapshot
+DELTA_PROTOCOL = 2
+# Intervals without a new sample after which a node is marked stale in the unified stream
+STALE_INTERVALS = 2
 
-async def _forward_metrics(websocket: WebSocket, q: asyncio.Queue) -> None:
-    """Forward metrics from the monitor's queue to the websocket.
+
+@dataclass
+class Channel:
+    """Websocket connection along with its negotiated options and traffic counters.
+
+    >>> Channel
+
+    """
+
+    websocket: WebSocket
+    delta: bool = False
+    compress: bool = False
+    raw_bytes: int = 0
+    sent_bytes: int = 0
+
+    @property
+    def peer(self) -> str:
+        """Address of the websocket client as ``host:port``."""
+        if client := self.websocket.client:
+            return f"{client.host}:{client.port}"
+        return "unknown"
+
+    async def send_frame(self, frame: Frame, delta: bool = False) -> None:
+        """Send a frame, reusing the encodings cached on it by previous sends.
+
+        Args:
+            frame: Frame to be sent.
+            delta: Send the frame's delta message instead of its full message.
+        """
+        start = time.perf_counter()
+        if instrumentation.ENABLED:
+            instrumentation.queued(self.peer, frame.published)
+        raw = frame.encoded(delta)
+        self.raw_bytes += len(raw)
+        if self.compress:
+            blob = frame.compressed(delta)
+            self.sent_bytes += len(blob)
+            await self.websocket.send_bytes(blob)
+        else:
+            self.sent_bytes += len(raw)
+            await self.websocket.send_text(frame.delta_text if delta else frame.text)
+        prometheus.subscriber_send_seconds.observe(time.perf_counter() - start)
+
+    async def send_text(self, text: str) -> None:
+        """Send a message composed for this websocket alone.
+
+        Args:
+            text: Encoded message to be sent.
+        """
+        start = time.perf_counter()
+        raw = text.encode()
+        self.raw_bytes += len(raw)
+        if self.compress:
+            blob = zlib.compress(raw, ZLIB_LEVEL)
+            self.sent_bytes += len(blob)
+            await self.websocket.send_bytes(blob)
+        else:
+            self.sent_bytes += len(raw)
+            await self.websocket.send_text(text)
+        prometheus.subscriber_send_seconds.observe(time.perf_counter() - start)
+
+    async def close_slow(self, error: SlowConsumerError) -> None:
+        """Close the websocket of a subscriber disconnected by its backpressure policy.
+
+        Args:
+            error: Error raised by the subscription.
+        """
+        LOGGER.warning("Closing slow websocket [%s]: %s", self.peer, error)
+        try:
+            await self.websocket.close(code=1013, reason="Too slow to keep up with the stream")
+        except Exception as debug:
+            LOGGER.debug("Error closing slow websocket: %s", debug)
+
+
+def _use_delta(frame: Frame, last_seq: int | None, delta: bool) -> bool:
+    """Check whether a frame can be sent as a delta on a websocket.
 
     Args:
-        websocket: FastAPI WebSocket connection.
-        q: asyncio.Queue to receive metrics from the monitor.
+        frame: Metrics frame to be sent.
+        last_seq: Sequence number of the last frame of the same node sent on the websocket.
+        delta: Whether the websocket negotiated the delta protocol.
+
+    Returns:
+        bool:
+        True when the websocket already holds the preceding frame and the frame is not a keyframe.
     """
+    return delta and frame.delta is not None and last_seq == frame.seq - 1
+
+
+async def _forward_metrics(channel: Channel, sub: Subscription) -> None:
+    """Forward metrics from the monitor's subscription to the websocket.
+
+    Args:
+        channel: Websocket connection to forward to.
+        sub: Subscription to receive metrics from the monitor.
+    """
+    last_seq: int | None = None
     try:
         while True:
-            payload = await q.get()
-            await websocket.send_json(payload)
+            frame = await sub.get()
+            if frame.type != "metrics":
+                await channel.send_frame(frame)
+                continue
+            await channel.send_frame(frame, _use_delta(frame, last_seq, channel.delta))
+            last_seq = frame.seq
+    except SlowConsumerError as error:
+        await channel.close_slow(error)
     except Exception as debug:
         LOGGER.debug("Forward task stopped: %s", debug)
 
 
+def _repeat_entry(target: Dict[str, str], frame: Frame, delta: bool) -> str:
+    """Entry repeating the latest sample of a node, which has already been sent on the websocket.
+
+    Args:
+        target: Target configuration of the node.
+        frame: Latest frame of the node.
+        delta: Whether the websocket negotiated the delta protocol.
+
+    Returns:
+        str:
+        Empty delta entry with the delta protocol, full entry otherwise.
+    """
+    if delta:
+        return squire.dumps({"name": target["name"], "base_url": target["base_url"], "delta": {}})
+    return frame.entry
+
+
+async def subscribe(
+    target: Dict[str, str], flags: Dict[str, bool], policy: enums.Backpressure | None = None
+) -> Tuple[Monitor, Subscription]:
+    """Subscribe to the shared monitor of a target, creating and starting it on first use.
+
+    Args:
+        target: Target configuration with keys 'name', 'base_url', and 'apikey'.
+        flags: Stream flags of the subscriber, used to attach to the matching stream variant.
+        policy: Backpressure policy of the subscriber, defaults to ``ws_backpressure``.
+
+    Returns:
+        Tuple[Monitor, Subscription]:
+        Shared monitor for the target and the subscription to it.
+    """
+    base_url = target["base_url"]
+    if not (monitor := GLOBAL_MONITORS.get(base_url)):
+        monitor = GLOBAL_MONITORS[base_url] = MONITOR_FACTORY(target)
+    sub = monitor.subscribe(policy, **flags)
+    prometheus.track_subscriber(base_url, sub)
+    if not monitor.is_running:
+        await monitor.start()
+    return monitor, sub
+
+
+async def unsubscribe(monitor: Monitor, sub: Subscription) -> None:
+    """Unsubscribe from a shared monitor, stopping it when the last subscriber leaves.
+
+    Args:
+        monitor: Shared monitor to unsubscribe from.
+        sub: Subscription to be removed from the monitor's subscribers.
+
+    Notes:
+        Persistent monitors started at lifespan (Prometheus mode) are never stopped here.
+    """
+    monitor.unsubscribe(sub)
+    if monitor.subscribers or monitor.persistent:
+        return
+    # Remove from registry before stopping, so a new viewer gets a fresh monitor instead of a stopping one
+    if GLOBAL_MONITORS.get(monitor.base_url) is monitor:
+        del GLOBAL_MONITORS[monitor.base_url]
+    LOGGER.info("No subscribers left for [%s], stopping monitor", monitor.name)
+    await monitor.stop()
+
+
+def health() -> Dict[str, Dict[str, Any]]:
+    """Connection state of each running monitor.
+
+    Returns:
+        Dict[str, Dict[str, Any]]:
+        Name, state, consecutive failures and seconds until the next attempt of each monitor, keyed by base URL.
+    """
+    return {
+        base_url: {
+            "name": monitor.name,
+            "state": monitor.policy.state,
+            "failures": monitor.policy.failures,
+            "retry_in": monitor.policy.retry_in,
+        }
+        for base_url, monitor in GLOBAL_MONITORS.items()
+    }
+
+
 def _normalize_targets() -> List[Dict[str, str]]:
     """Return configuration targets sorted so legend colors are consistent."""
     return sorted(settings.env.targets, key=lambda t: t["name"].lower())
 
 
 async def _forward_metrics_multi(
-    websocket: WebSocket,
-    queues: List[asyncio.Queue],
+    channel: Channel,
+    subs: List[Subscription],
     targets: List[Dict[str, str]],
 ) -> None:
-    """Fan-in metrics from multiple monitors and emit once every node updates.
+    """Fan-in metrics from multiple monitors and emit the latest sample of every node on a fixed cadence.
 
     Args:
-        websocket: FastAPI WebSocket connection.
-        queues: List of asyncio.Queues from multiple monitors.
-        targets: List of target configurations corresponding to the queues.
+        channel: Websocket connection to forward to.
+        subs: List of subscriptions to multiple monitors.
+        targets: List of target configurations corresponding to the subscriptions.
 
     Notes:
-        This is resilient to individual node failures.
-        If a monitor starts emitting an ``error`` payload (e.g. exceeded error threshold),
-        that node is marked as failed and removed from the unified stream,
-        so that the remaining nodes keep updating in the UI.
+        Subscriptions are multiplexed with ``asyncio.wait``, and a merged frame is emitted every ``interval`` seconds
+        with the latest known sample of each node, so a slow or stalled node never holds back the others.
+        Each node in the merged frame carries the ``age`` of its sample, and is marked ``stale`` once the sample
+        is older than ``STALE_INTERVALS`` intervals.
+        Connection ``state`` frames of the monitors are forwarded as they arrive. An unreachable node is marked
+        ``stale`` while the other nodes keep updating, and resumes in the same stream once its monitor reconnects.
     """
-    # Track active (non-failed) indices
-    active = [True] * len(queues)
-
-    # Latest payload per node keyed by base_url
-    latest: Dict[str, dict] = {}
+    loop = asyncio.get_running_loop()
+    interval = settings.env.interval
+
+    # Pending get per subscription, mapped to the subscription's index
+    getters = {asyncio.create_task(sub.get()): idx for idx, sub in enumerate(subs)}
+    # Latest frame per node keyed by base_url, along with the loop time it was received
+    latest: Dict[str, Tuple[Frame, float]] = {}
+    # Sequence number of the last frame sent per node keyed by base_url
+    sent: Dict[str, int] = {}
+    deadline = loop.time() + interval
     try:
         while True:
-            # If all nodes have failed, stop the unified stream loop.
-            if not any(active):
-                LOGGER.info("All targets in unified stream have failed; stopping multi-node forwarder")
-                return
-
-            # Wait for at least one payload from any active queue.
-            # We gather one payload per active queue in a "round", but we do
-            # not block forever on failed queues because we mark them inactive
-            # as soon as they send an error.
-            for idx, q in enumerate(queues):
-                if not active[idx]:
-                    continue
-
-                payload = await q.get()
-
-                # Handle error payloads from monitors: mark this node as failed
-                # and notify the UI once, then skip it from future
-                # rounds so the rest of the nodes continue streaming.
-                if isinstance(payload, dict) and payload.get("type") == "error":
-                    base_url = targets[idx]["base_url"]
-                    LOGGER.warning("Unified stream: target %s reported error and will be skipped", base_url)
+            done, _ = await asyncio.wait(
+                getters, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                idx = getters.pop(task)
+                frame: Frame = task.result()
+                base_url = targets[idx]["base_url"]
 
-                    # Forward the error to the websocket so the UI can show it.
+                getters[asyncio.create_task(subs[idx].get())] = idx
+                if frame.type == "state":
+                    # Forward connection state changes, the node stays in the stream and resumes once it recovers
                     try:
-                        await websocket.send_json(payload)
-                    except Exception as send_err:  # pragma: no cover - defensive
-                        LOGGER.debug("Failed to send error payload to WS: %s", send_err)
-
-                    # Mark this target as inactive and remove its latest sample
-                    active[idx] = False
-                    latest.pop(base_url, None)
+                        await channel.send_frame(frame)
+                    except Exception as send_err:
+                        LOGGER.error("Failed to send state of %s to WS: %s", base_url, send_err)
+                        return
                     continue
 
                 # Normal metrics payload: remember latest per base_url
-                base_url = targets[idx]["base_url"]
-                latest[base_url] = payload
-
-            # Build merged message from all currently active targets that have
-            # produced at least one metrics payload.
-            merged = {
-                "type": "metrics",
-                "ts": asyncio.get_running_loop().time(),
-                "data": [],
-            }
-
-            for idx, target in enumerate(targets):
-                if not active[idx]:
-                    continue
-                sample = latest.get(target["base_url"])
-                if not sample:
-                    continue
-                merged["data"].extend(sample.get("data", []))
+                latest[base_url] = frame, loop.time()
 
-            # If we have no data (e.g. new round before any active node
-            # produced metrics), skip sending to avoid spamming empty payloads.
-            if not merged["data"]:
+            now = loop.time()
+            if now < deadline:
+                continue
+            # Next tick, skipping the ticks missed while sending
+            deadline = max(deadline + interval, now)
+
+            # Build merged message from the pre-encoded entries of all currently
+            # active targets that have produced at least one metrics payload.
+            entries = []
+            for target in targets:
+                base_url = target["base_url"]
+                if not (sample := latest.get(base_url)):
+                    continue
+                frame, received = sample
+                if sent.get(base_url) == frame.seq:
+                    # No new sample since the last tick, repeat the latest one (as an empty delta if negotiated)
+                    entry = _repeat_entry(target, frame, channel.delta)
+                elif _use_delta(frame, sent.get(base_url), channel.delta):
+                    entry = frame.delta
+                else:
+                    entry = frame.entry
+                sent[base_url] = frame.seq
+                age = round(now - received, 1)
+                entries.append(annotate(entry, age=age, stale=age > interval * STALE_INTERVALS))
+
+            # If we have no data (e.g. no active node produced metrics yet),
+            # skip sending to avoid spamming empty payloads.
+            if not entries:
                 continue
 
             try:
-                await websocket.send_json(merged)
+                await channel.send_text(merge(entries, now))
             except Exception as send_err:
                 LOGGER.error("Failed to send merged payload to WS: %s", send_err)
                 return
+    except SlowConsumerError as error:
+        await channel.close_slow(error)
     except asyncio.CancelledError:
         LOGGER.debug("Unified stream task cancelled")
+    finally:
+        for task in getters:
+            task.cancel()
 
 
 async def _connection_timeout(websocket: WebSocket, timeout: int) -> None:
@@ -143,6 +335,93 @@ async def _connection_timeout(websocket: WebSocket, timeout: int) -> None:
         LOGGER.debug("Error closing websocket after timeout: %s", debug)
 
 
+async def _attach(
+    channel: Channel, base_url: str, flags: Dict[str, bool], backfill: bool = False
+) -> Tuple[List[Tuple[Monitor, Subscription]], asyncio.Task]:
+    """Subscribe the websocket to the requested target(s) and start forwarding metrics.
+
+    Args:
+        channel: Websocket connection to forward to.
+        base_url: Base URL of the target to stream, or ``*`` for the unified stream of all targets.
+        flags: Stream flags of the websocket connection.
+        backfill: Sends the targets' recent history ahead of the live frames.
+
+    Returns:
+        Tuple[List[Tuple[Monitor, Subscription]], asyncio.Task]:
+        Subscriptions held by the websocket and the task forwarding their metrics.
+    """
+    if base_url == "*":
+        LOGGER.info("Gathering metrics for all targets in unified stream")
+        targets = _normalize_targets()
+        subscriptions = [await subscribe(target, flags) for target in targets]
+        subs = [sub for _, sub in subscriptions]
+        if backfill:
+            await _backfill(channel, subscriptions)
+        await _send_states(channel, subscriptions)
+        return subscriptions, asyncio.create_task(_forward_metrics_multi(channel, subs, targets))
+
+    if target := settings.targets_by_url.get(base_url):
+        LOGGER.info("Gathering metrics for: %s", target["name"])
+    else:
+        LOGGER.warning(f"Invalid base url: {base_url}")
+        raise WebSocketDisconnect(code=400, reason=f"Invalid base url: {base_url}")
+
+    # attach to the shared monitor with a new subscription
+    monitor, sub = await subscribe(target, flags)
+    if backfill:
+        await _backfill(channel, [(monitor, sub)])
+    await _send_states(channel, [(monitor, sub)])
+    return [(monitor, sub)], asyncio.create_task(_forward_metrics(channel, sub))
+
+
+async def _backfill(channel: Channel, subscriptions: List[Tuple[Monitor, Subscription]]) -> None:
+    """Send the recent history of the subscribed targets, so a new viewer starts with populated charts.
+
+    Args:
+        channel: Websocket connection to send to.
+        subscriptions: Subscriptions held by the websocket.
+    """
+    data = [
+        {"name": monitor.name, "base_url": monitor.base_url, "history": monitor.history.snapshot()}
+        for monitor, _ in subscriptions
+        if len(monitor.history)
+    ]
+    if data:
+        await channel.send_text(squire.dumps({"type": "backfill", "data": data}))
+
+
+async def _send_states(channel: Channel, subscriptions: List[Tuple[Monitor, Subscription]]) -> None:
+    """Send the connection state of the subscribed targets that are not streaming yet.
+
+    Args:
+        channel: Websocket connection to send to.
+        subscriptions: Subscriptions held by the websocket.
+    """
+    for monitor, sub in subscriptions:
+        if monitor.policy_of(sub.variant).state != enums.MonitorState.connected:
+            await channel.send_frame(monitor.state_frame(sub.variant))
+
+
+async def _detach(
+    channel: Channel, subscriptions: List[Tuple[Monitor, Subscription]], forward_task: asyncio.Task | None
+) -> None:
+    """Stop forwarding metrics and release the websocket's subscriptions.
+
+    Args:
+        channel: Websocket connection detaching.
+        subscriptions: Subscriptions held by the websocket.
+        forward_task: Task forwarding the subscriptions' metrics.
+    """
+    if forward_task:
+        forward_task.cancel()
+        # a forwarder that failed on its own must not keep the subscriptions from being released
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await forward_task
+    for monitor, sub in subscriptions:
+        await unsubscribe(monitor, sub)
+    subscriptions.clear()
+
+
 async def websocket_endpoint(websocket: WebSocket) -> None:
     """Websocket endpoint to handle observability data streaming.
 
@@ -152,118 +431,112 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     await websocket.accept()
     timeout_task = asyncio.create_task(_connection_timeout(websocket, settings.env.timeout))
 
-    monitor: Monitor | None = None
-    q: asyncio.Queue | None = None
-    monitors: List[Monitor] = []
-    queues: List[asyncio.Queue] = []
-    multi_task: asyncio.Task | None = None
+    channel = Channel(websocket)
+    base_url: str | None = None
+    flags = dict(FLAGS)
+    subscriptions: List[Tuple[Monitor, Subscription]] = []
     forward_task: asyncio.Task | None = None
 
     try:
         while True:
             msg = await websocket.receive_text()
             data = json.loads(msg)
+
+            # -------------------------------------------
+            # UI toggles stream options, move to the matching stream variant
+            # -------------------------------------------
             if data.get("type") == "update_flags":
-                if monitor:
-                    await monitor.update_flags(
-                        all_services=data.get("all_services", False),
-                    )
-                elif monitors:
-                    await asyncio.gather(
-                        *(
-                            mon.update_flags(
-                                all_services=data.get("all_services", False),
-                            )
-                            for mon in monitors
-                        )
-                    )
+                flags["all_services"] = bool(data.get("all_services", False))
+                if base_url:
+                    LOGGER.info("Switching to stream variant %s", flags)
+                    # attach before releasing the old subscriptions, so a sole viewer's monitor (and its history)
+                    # is not stopped and recreated by the switch
+                    previous = subscriptions
+                    await _detach(channel, [], forward_task)
+                    subscriptions, forward_task = await _attach(channel, base_url, flags)
+                    await _detach(channel, previous, None)
                 continue
 
             # -------------------------------------------
             # UI requests a specific target to monitor
             # -------------------------------------------
             if data.get("type") == "select_target":
-                base_url = data["base_url"]
-
-                # stop old monitor / tasks
                 if forward_task:
                     LOGGER.info("Stopping previous forwarder task")
-                    forward_task.cancel()
-                    forward_task = None
-
-                if monitor:
-                    LOGGER.info("Stopping previous monitor task")
-                    monitor.unsubscribe(q)
-                    monitor = None
-                    q = None
-
-                if multi_task:
-                    LOGGER.info("Stopping previous multi-target forwarder task")
-                    multi_task.cancel()
-                    multi_task = None
-
-                for idx, mon in enumerate(monitors):
-                    mon.unsubscribe(queues[idx])
-                    await mon.stop()
-
-                monitors.clear()
-                queues.clear()
-
-                if base_url == "*":
-                    LOGGER.info("Gathering metrics for all targets in unified stream")
-                    targets = _normalize_targets()
-                    for target in targets:
-                        mon = Monitor(target)
-                        if not mon.is_running:
-                            await mon.start()
-                        monitors.append(mon)
-                        queues.append(mon.subscribe())
-                    multi_task = asyncio.create_task(_forward_metrics_multi(websocket, queues, targets))
-                    continue
-
-                if target := settings.targets_by_url.get(base_url):
-                    LOGGER.info("Gathering metrics for: %s", target["name"])
-                else:
-                    LOGGER.warning(f"Invalid base url: {base_url}")
-                    raise WebSocketDisconnect(code=400, reason=f"Invalid base url: {base_url}")
-
-                # create new monitor
-                if not GLOBAL_MONITORS.get(base_url):
-                    GLOBAL_MONITORS[base_url] = Monitor(target)
-                monitor = GLOBAL_MONITORS[base_url]
-                if not monitor.is_running:
-                    await monitor.start()
-
-                # new subscription queue
-                q = monitor.subscribe()
-
-                # start forwarding metrics
-                forward_task = asyncio.create_task(_forward_metrics(websocket, q))
+                await _detach(channel, subscriptions, forward_task)
+                forward_task = None
+                base_url = data["base_url"]
+                if "all_services" in data:
+                    flags["all_services"] = bool(data["all_services"])
+                channel.delta = int(data.get("protocol", 1)) >= DELTA_PROTOCOL
+                # app-level compression is used only when configured, and the client can decode it
+                channel.compress = settings.env.ws_compression == enums.Compression.zlib and "zlib" in data.get(
+                    "compression", []
+                )
+                subscriptions, forward_task = await _attach(channel, base_url, flags, backfill=True)
     except WebSocketDisconnect:
         pass
     except Exception as err:
         LOGGER.error("WS error: %s", err)
         raise WebSocketDisconnect(code=500, reason="Internal server error") from err
-
-    # cleanup
-    if forward_task:
-        forward_task.cancel()
+    finally:
+        # cleanup
+        await _detach(channel, subscriptions, forward_task)
+        instrumentation.forget_connection(channel.peer)
+        timeout_task.cancel()
         with contextlib.suppress(asyncio.CancelledError):
-            await forward_task
+            await timeout_task
+        LOGGER.info(
+            "WebSocket [%s] sent %d bytes, %d bytes before compression",
+            channel.peer,
+            channel.sent_bytes,
+            channel.raw_bytes,
+        )
 
-    if monitor:
-        if q:
-            monitor.unsubscribe(q)
 
-    if multi_task:
-        multi_task.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await multi_task
+async def _relay_frames(websocket: WebSocket, monitor: Monitor, sub: Subscription) -> None:
+    """Send the packed frames of a subscription to a peer instance.
 
-    if timeout_task:
-        timeout_task.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await timeout_task
+    Args:
+        websocket: Websocket connection of the peer.
+        monitor: Monitor subscribed to.
+        sub: Subscription of the peer.
+    """
+    if monitor.policy_of(sub.variant).state != enums.MonitorState.connected:
+        await websocket.send_bytes(monitor.state_frame(sub.variant).packed())
+    while True:
+        await websocket.send_bytes((await sub.get()).packed())
 
-    for idx, mon in enumerate(monitors):
-        mon.unsubscribe(queues[idx])
+
+async def peer_endpoint(websocket: WebSocket) -> None:
+    """Websocket endpoint relaying a target owned by this instance to a peer instance.
+
+    Args:
+        websocket: FastAPI WebSocket connection, authenticated with the token shared by the peers.
+    """
+    if not hmac.compare_digest(websocket.headers.get("authorization", ""), f"Bearer {settings.env.peer_token}"):
+        LOGGER.warning("Rejected peer connection from %s:%s", websocket.client.host, websocket.client.port)
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    request = json.loads(await websocket.receive_text())
+    target = settings.targets_by_url.get(request.get("base_url"))
+    # relaying a target owned by another peer would loop between instances that disagree on the peers
+    if not target or not sharding.owns(target["base_url"]):
+        LOGGER.warning("Peer requested a target not owned by this instance: %s", request.get("base_url"))
+        await websocket.close(code=1008, reason="Target not owned by this instance")
+        return
+    # peers never disconnect for falling behind, the backpressure policy applies to their own subscribers
+    monitor, sub = await subscribe(target, request.get("flags") or {}, enums.Backpressure.drop_oldest)
+    forward_task = asyncio.create_task(_relay_frames(websocket, monitor, sub))
+    try:
+        # reads nothing more from the peer, other than the end of the connection
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forward_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+            await forward_task
+        await unsubscribe(monitor, sub)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi import WebSocketDisconnect
+
+from pyobservability import transport
+from pyobservability.config import settings
+from pyobservability.monitor import Monitor
+
+BASE_URL = "http://127.0.0.1:9/"
+
+
+class FakeWebSocket:
+    """Websocket of a single client, fed with the messages sent by the test."""
+
+    def __init__(self):
+        self.client = SimpleNamespace(host="127.0.0.1", port=50000)
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.sent = []
+
+    async def accept(self):
+        """Accept the connection."""
+        pass
+
+    async def receive_text(self) -> str:
+        """Next message of the client, disconnecting on ``None``."""
+        msg = await self.inbox.get()
+        if msg is None:
+            raise WebSocketDisconnect(code=1000)
+        return msg
+
+    async def send_text(self, text: str):
+        """Keep a text message sent to the client."""
+        self.sent.append(text)
+
+    async def send_bytes(self, blob: bytes):
+        """Keep a binary message sent to the client."""
+        self.sent.append(blob)
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        """Close the connection, as seen by the endpoint."""
+        await self.inbox.put(None)
+
+
+async def _settle(websocket: FakeWebSocket) -> None:
+    """Wait for the endpoint to process the messages queued so far."""
+    while not websocket.inbox.empty():
+        await asyncio.sleep(0)
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_update_flags_keeps_sole_viewers_monitor(monkeypatch):
+    """Toggling the stream flags must not stop and recreate the monitor of its only viewer."""
+    env = settings.EnvConfig(targets=[{"name": "node", "base_url": BASE_URL, "apikey": "key"}])
+    monkeypatch.setattr(settings, "env", env, raising=False)
+    monkeypatch.setattr(settings, "targets_by_url", {}, raising=False)
+    settings.index_targets(env)
+    monkeypatch.setattr(transport, "MONITOR_FACTORY", Monitor)
+
+    async def scenario():
+        websocket = FakeWebSocket()
+        endpoint = asyncio.create_task(transport.websocket_endpoint(websocket))
+
+        await websocket.inbox.put(json.dumps({"type": "select_target", "base_url": BASE_URL}))
+        await _settle(websocket)
+        monitor = transport.GLOBAL_MONITORS[BASE_URL]
+        monitor.history.append({"cpu_usage": [10.0]}, 1.0)
+        history = monitor.history
+
+        for all_services in (True, False):
+            await websocket.inbox.put(json.dumps({"type": "update_flags", "all_services": all_services}))
+            await _settle(websocket)
+            assert transport.GLOBAL_MONITORS[BASE_URL] is monitor
+            assert monitor.is_running
+            assert monitor.history is history and len(history) == 1
+            assert monitor.subscribers == 1
+
+        await websocket.inbox.put(None)
+        await endpoint
+        assert BASE_URL not in transport.GLOBAL_MONITORS
+
+    asyncio.run(scenario())